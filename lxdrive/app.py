@@ -8,6 +8,7 @@ Alternativa opensource a Insync.
 
 import sys
 import signal
+import threading
 from pathlib import Path
 from typing import Optional
 from PyQt6.QtWidgets import QApplication, QMessageBox
@@ -16,7 +17,7 @@ from loguru import logger
 
 from .core import RcloneWrapper, AccountManager, SyncManager, MountManager
 from .gui import MainWindow, TrayIcon
-from .utils import Config, setup_logger
+from .utils import get_config, setup_logger
 from .utils.activity_log import ActivityLogManager, get_activity_log_manager, ActivityType, ActivityAction
 
 
@@ -49,7 +50,7 @@ class LXDriveApp:
         """Inicializa todos los componentes de la aplicación"""
         
         # Inicializar configuración
-        self.config = Config()
+        self.config = get_config()
         
         # Configurar logging
         log_dir = Path.home() / ".config" / "lxdrive" / "logs"
@@ -85,7 +86,8 @@ class LXDriveApp:
             on_start=self._on_sync_start,
             on_complete=self._on_sync_complete,
             on_error=self._on_sync_error,
-            on_activity=self._on_file_activity
+            on_activity=self._on_file_activity,
+            on_activity_batch=self._on_file_activity_batch
         )
         
         # Configurar callback de actividad de montaje
@@ -155,10 +157,16 @@ class LXDriveApp:
             logger.info("Servicio de sincronización iniciado")
         
         # Auto-montar cuentas que se dejaron montadas (persistencia de estado)
-        for account in self.account_manager.get_all():
-            if account.mount_enabled:
+        # En segundo plano y en paralelo para no bloquear el arranque de la GUI
+        mount_accounts = self.account_manager.get_mount_accounts()
+        if mount_accounts:
+            for account in mount_accounts:
                 logger.info(f"Remontando automáticamente unidad: {account.name}")
-                self.mount_manager.mount(account.id)
+            threading.Thread(
+                target=self.mount_manager.mount_all,
+                name="auto-mount",
+                daemon=True
+            ).start()
         
         # Mostrar ventana según configuración
         if not self.config.get("start_minimized", False):
@@ -202,6 +210,14 @@ class LXDriveApp:
         else:
             logger.info("No había unidades montadas para limpiar")
 
+        # 3. Detener el daemon rclone rcd compartido
+        if self.rclone:
+            self.rclone.shutdown()
+
+        # Guardar cambios de configuración aún pendientes
+        if self.config:
+            self.config.flush()
+
         # Ocultar icono de bandeja
         self.tray_icon.hide()
 
@@ -301,7 +317,12 @@ class LXDriveApp:
         
         # Emitir señal para la UI
         if self.main_window and hasattr(self.main_window, 'bridge'):
-            self.main_window.bridge.activity_signal.emit(account_id, name, action, path)
+            self.main_window.bridge.queue_activity(account_id, name, action, path)
+
+    def _on_file_activity_batch(self, batch: list):
+        """Callback con un lote de actividad de sync (fuera del hilo lector de rclone)"""
+        for account_id, name, action, path in batch:
+            self._on_file_activity(account_id, name, action, path)
 
     def _on_mount_activity(self, account_id: str, name: str, action: str, path: str):
         """Callback cuando hay actividad en la unidad virtual (Mount)"""
@@ -329,7 +350,7 @@ class LXDriveApp:
         
         # Emitir señal para la UI
         if self.main_window and hasattr(self.main_window, 'bridge'):
-            self.main_window.bridge.activity_signal.emit(account_id, name, action, path)
+            self.main_window.bridge.queue_activity(account_id, name, action, path)
     
     def _on_sync_error(self, account_id: str, message: str):
         """Callback cuando hay error en sincronización"""
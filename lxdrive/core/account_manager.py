@@ -8,7 +8,7 @@ configuradas en lX Drive.
 
 import json
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable
 from dataclasses import dataclass, asdict, field
 from datetime import datetime
 from enum import Enum
@@ -199,10 +199,49 @@ class AccountManager:
         self.config_dir = config_dir or Path.home() / ".config" / "lxdrive"
         self.accounts_file = self.config_dir / "accounts.json"
         self._accounts: Dict[str, Account] = {}
+        # Se incrementa en cada alta/baja o edición que afecte a la
+        # sincronización, para invalidar cachés externas
+        self.mutation_epoch = 0
+        # Callbacks avisados tras cada cambio que incrementa mutation_epoch
+        self._change_listeners: List[Callable[[], None]] = []
+        # Última configuración de sincronización vista por cuenta. Se guarda
+        # aparte porque update() suele recibir la misma instancia ya modificada
+        self._sync_signatures: Dict[str, tuple] = {}
         
         self._ensure_config_dir()
         self._load_accounts()
     
+    @staticmethod
+    def _sync_signature(account: Account) -> tuple:
+        """Campos de la cuenta de los que depende la planificación de sincronizaciones"""
+        return (
+            account.remote_name,
+            account.sync_interval,
+            tuple(
+                (p.id, p.local_path, p.remote_path, p.direction, p.enabled)
+                for p in account.sync_pairs
+            )
+        )
+    
+    def add_change_listener(self, callback: Callable[[], None]):
+        """
+        Registra un callback que se invoca cuando se añade o elimina una cuenta
+        o cambia su configuración de sincronización (no su estado).
+        
+        Args:
+            callback: Función sin argumentos
+        """
+        self._change_listeners.append(callback)
+    
+    def _notify_changed(self):
+        """Invalida cachés externas (mutation_epoch) y avisa a los listeners"""
+        self.mutation_epoch += 1
+        for callback in self._change_listeners:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Error en listener de cuentas: {e}")
+    
     def _ensure_config_dir(self):
         """Crea el directorio de configuración si no existe"""
         self.config_dir.mkdir(parents=True, exist_ok=True)
@@ -221,6 +260,7 @@ class AccountManager:
             for account_data in data.get("accounts", []):
                 account = Account.from_dict(account_data)
                 self._accounts[account.id] = account
+                self._sync_signatures[account.id] = self._sync_signature(account)
             
             logger.info(f"Cargadas {len(self._accounts)} cuentas")
             
@@ -312,7 +352,9 @@ class AccountManager:
                 return False
         
         self._accounts[account.id] = account
+        self._sync_signatures[account.id] = self._sync_signature(account)
         self._save_accounts()
+        self._notify_changed()
         
         logger.info(f"Cuenta añadida: {account.name} ({account.id})")
         return True
@@ -334,6 +376,12 @@ class AccountManager:
         self._accounts[account.id] = account
         self._save_accounts()
         
+        # Estado, fechas de última sync, etc. no invalidan las cachés externas
+        signature = self._sync_signature(account)
+        if signature != self._sync_signatures.get(account.id):
+            self._sync_signatures[account.id] = signature
+            self._notify_changed()
+        
         logger.info(f"Cuenta actualizada: {account.name}")
         return True
     
@@ -352,7 +400,9 @@ class AccountManager:
             return False
         
         account = self._accounts.pop(account_id)
+        self._sync_signatures.pop(account_id, None)
         self._save_accounts()
+        self._notify_changed()
         
         logger.info(f"Cuenta eliminada: {account.name}")
         return True
@@ -6,14 +6,40 @@ Detecta cuando un archivo ha sido modificado en ambos lados (local y remoto)
 desde la última sincronización y proporciona estrategias para resolverlos.
 """
 
-import json
+import functools
+import itertools
+import os
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import Iterator, List, Dict, Optional, Tuple
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 from loguru import logger
 
+from ..utils.fileio import atomic_write
+from ..utils.jsonio import json_dumps, json_loads
+
+try:
+    import ciso8601
+    CISO8601_AVAILABLE = True
+except ImportError:
+    CISO8601_AVAILABLE = False
+
+
+def _parse_iso(mod_time: str) -> datetime:
+    """Parsea un ModTime ISO8601 de rclone (con 'Z' y hasta nanosegundos)"""
+    if CISO8601_AVAILABLE:
+        return ciso8601.parse_datetime(mod_time)
+    return datetime.fromisoformat(mod_time.replace('Z', '+00:00'))
+
+
+@functools.lru_cache(maxsize=4096)
+def _iso_to_epoch(mod_time: str) -> float:
+    """Convierte un ModTime ISO8601 de rclone a segundos epoch (cacheado: se repiten mucho)"""
+    return _parse_iso(mod_time).timestamp()
+
 
 class ConflictStrategy(Enum):
     """Estrategias para resolver conflictos"""
@@ -25,7 +51,7 @@ class ConflictStrategy(Enum):
     KEEP_BOTH = "keep_both"  # Mantener ambos (renombrar)
 
 
-@dataclass
+@dataclass(slots=True)
 class ConflictFile:
     """Representa un archivo en conflicto"""
     path: str
@@ -66,6 +92,9 @@ class ConflictResolver:
     en ambos lados desde la última sincronización.
     """
     
+    # Registros de historial que se conservan (el archivo se recorta al doble)
+    HISTORY_MAX = 100
+    
     def __init__(self, config_path: Optional[Path] = None):
         """
         Inicializa el resolver de conflictos.
@@ -75,13 +104,22 @@ class ConflictResolver:
         """
         self.config_path = config_path or Path.home() / ".config" / "lxdrive" / "conflicts.json"
         self.config = self._load_config()
+        self._refresh_extension_sets()
+        
+        # Historial de resoluciones: JSONL de solo-añadir, fuera del archivo de config
+        self.history_path = self.config_path.with_name("conflicts.log.jsonl")
+        self._history: deque = deque(maxlen=self.HISTORY_MAX)
+        self._history_lines = 0
+        # Contadores del historial en memoria, mantenidos al añadir/descartar
+        self._action_counter: Counter = Counter()
+        self._strategy_counter: Counter = Counter()
+        self._load_history()
         
     def _load_config(self) -> Dict:
         """Carga la configuración de conflictos"""
         if self.config_path.exists():
             try:
-                with open(self.config_path) as f:
-                    return json.load(f)
+                return json_loads(self.config_path.read_bytes())
             except Exception as e:
                 logger.error(f"Error cargando config de conflictos: {e}")
         
@@ -90,19 +128,146 @@ class ConflictResolver:
             "default_strategy": ConflictStrategy.ASK.value,
             "auto_resolve_extensions": [".tmp", ".cache", ".lock"],
             "always_ask_extensions": [".docx", ".xlsx", ".pdf", ".txt"],
-            "keep_both_suffix": "_conflict_{timestamp}",
-            "conflict_history": []
+            "keep_both_suffix": "_conflict_{timestamp}"
         }
     
+    def _refresh_extension_sets(self):
+        """Precalcula los conjuntos de extensiones para búsquedas O(1)"""
+        self._auto_resolve = frozenset(self.config.get("auto_resolve_extensions", []))
+        self._always_ask = frozenset(self.config.get("always_ask_extensions", []))
+    
+    def _load_history(self):
+        """Carga el historial JSONL (y migra el que antes vivía en la config)"""
+        try:
+            with open(self.history_path, "rb") as f:
+                for line in f:
+                    self._history_lines += 1
+                    try:
+                        self._remember(json_loads(line))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"Error cargando historial de conflictos: {e}")
+        
+        legacy = self.config.pop("conflict_history", None)
+        if legacy is not None:
+            for entry in legacy:
+                self._append_history(entry)
+            self._save_config()
+    
+    def _remember(self, entry: Dict):
+        """Añade una entrada al historial en memoria y actualiza los contadores"""
+        if len(self._history) == self._history.maxlen:
+            evicted = self._history[0]
+            for counter, key in ((self._action_counter, "action"), (self._strategy_counter, "strategy")):
+                value = evicted.get(key, "unknown")
+                counter[value] -= 1
+                if counter[value] <= 0:
+                    del counter[value]
+        
+        self._history.append(entry)
+        self._action_counter[entry.get("action", "unknown")] += 1
+        self._strategy_counter[entry.get("strategy", "unknown")] += 1
+    
+    def _append_history(self, entry: Dict):
+        """Añade una línea al historial, recortando el archivo de vez en cuando"""
+        self._remember(entry)
+        try:
+            self.history_path.parent.mkdir(parents=True, exist_ok=True)
+            if self._history_lines >= 2 * self.HISTORY_MAX:
+                # Reescribir solo los últimos registros (no en cada escritura)
+                atomic_write(self.history_path, b"".join(json_dumps(e) + b"\n" for e in self._history))
+                self._history_lines = len(self._history)
+            else:
+                with open(self.history_path, "ab") as f:
+                    f.write(json_dumps(entry) + b"\n")
+                self._history_lines += 1
+        except OSError as e:
+            logger.error(f"Error guardando historial de conflictos: {e}")
+    
     def _save_config(self):
         """Guarda la configuración"""
         try:
             self.config_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.config_path, 'w') as f:
-                json.dump(self.config, f, indent=2)
+            atomic_write(self.config_path, json_dumps(self.config, indent=True))
         except Exception as e:
             logger.error(f"Error guardando config de conflictos: {e}")
     
+    def iter_conflicts(
+        self,
+        local_path: str,
+        remote_path: str,
+        rclone_wrapper
+    ) -> Iterator[ConflictFile]:
+        """
+        Genera los conflictos entre local y remoto a medida que se encuentran.
+        
+        Solo el listado local se guarda en memoria; el remoto se consume en
+        streaming desde rclone y se compara entrada a entrada.
+        
+        Args:
+            local_path: Ruta local
+            remote_path: Ruta remota (formato remote:path)
+            rclone_wrapper: Wrapper de rclone para listar archivos
+            
+        Yields:
+            Cada archivo en conflicto
+            
+        Raises:
+            RcloneError: Si falla el listado remoto
+        """
+        # Usar rclone check para encontrar diferencias
+        # Formato: rclone check local remote --combined output.txt
+        
+        # Por ahora, usamos una aproximación con lsjson
+        # En producción, usar rclone check es más eficiente
+        
+        logger.info(f"Detectando conflictos entre {local_path} y {remote_path}")
+        
+        remote_name, _, remote_subpath = remote_path.partition(":")
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # El recorrido local avanza mientras rclone arranca y lista el remoto
+            local_future = executor.submit(self._list_local_files, Path(local_path))
+            remote_files = rclone_wrapper.iter_files(remote_name, remote_subpath, recursive=True)
+            first_remote = next(remote_files, None)
+            local_map = {f["path"]: f for f in local_future.result()}
+        
+        if first_remote is None:
+            return
+        
+        # Búsqueda ligada fuera del bucle: es la única operación por cada entrada remota
+        local_get = local_map.get
+        for remote_file in itertools.chain((first_remote,), remote_files):
+            # Solo interesan los archivos que existen en ambos lados
+            file_path = remote_file.path
+            local_file = local_get(file_path)
+            if local_file is None:
+                continue
+            
+            # Mismo tamaño: no hay conflicto y no hace falta parsear tiempos
+            if local_file["size"] == remote_file.size:
+                continue
+            
+            try:
+                # Comparar en segundos epoch; los datetime solo se crean para conflictos
+                remote_epoch = _iso_to_epoch(remote_file.mod_time)
+            except ValueError as e:
+                logger.debug(f"Error parseando tiempos para {file_path}: {e}")
+                continue
+            
+            # Si ambos fueron modificados recientemente (últimas 24h), es conflicto
+            if abs(local_file["mtime"] - remote_epoch) < 86400:  # 24 horas
+                yield ConflictFile(
+                    path=file_path,
+                    name=local_file["name"],
+                    local_size=local_file["size"],
+                    remote_size=remote_file.size,
+                    local_mtime=datetime.fromtimestamp(local_file["mtime"]),
+                    remote_mtime=datetime.fromtimestamp(remote_epoch, timezone.utc).replace(tzinfo=None)
+                )
+    
     def detect_conflicts(
         self,
         local_path: str,
@@ -120,61 +285,8 @@ class ConflictResolver:
         Returns:
             Lista de archivos en conflicto
         """
-        conflicts = []
-        
         try:
-            # Usar rclone check para encontrar diferencias
-            # Formato: rclone check local remote --combined output.txt
-            
-            # Por ahora, usamos una aproximación con lsjson
-            # En producción, usar rclone check es más eficiente
-            
-            logger.info(f"Detectando conflictos entre {local_path} y {remote_path}")
-            
-            # Listar archivos locales
-            local_files = self._list_local_files(Path(local_path))
-            
-            # Listar archivos remotos
-            remote_name = remote_path.split(":")[0]
-            remote_subpath = remote_path.split(":", 1)[1] if ":" in remote_path else ""
-            remote_files = rclone_wrapper.list_files(remote_name, remote_subpath, recursive=True)
-            
-            # Crear mapas por nombre de archivo
-            local_map = {f["path"]: f for f in local_files}
-            remote_map = {f.path: f for f in remote_files}
-            
-            # Buscar archivos que existen en ambos lados
-            common_files = set(local_map.keys()) & set(remote_map.keys())
-            
-            for file_path in common_files:
-                local_file = local_map[file_path]
-                remote_file = remote_map[file_path]
-                
-                # Verificar si hay diferencias
-                size_diff = abs(local_file["size"] - remote_file.size)
-                
-                # Si hay diferencia de tamaño o tiempo, es potencial conflicto
-                if size_diff > 0:
-                    # Parsear tiempos
-                    try:
-                        local_mtime = datetime.fromtimestamp(local_file["mtime"])
-                        remote_mtime = datetime.fromisoformat(remote_file.mod_time.replace('Z', '+00:00'))
-                        
-                        # Si ambos fueron modificados recientemente (últimas 24h), es conflicto
-                        time_diff = abs((local_mtime - remote_mtime).total_seconds())
-                        
-                        if time_diff < 86400:  # 24 horas
-                            conflicts.append(ConflictFile(
-                                path=file_path,
-                                name=Path(file_path).name,
-                                local_size=local_file["size"],
-                                remote_size=remote_file.size,
-                                local_mtime=local_mtime,
-                                remote_mtime=remote_mtime.replace(tzinfo=None)
-                            ))
-                    except Exception as e:
-                        logger.debug(f"Error parseando tiempos para {file_path}: {e}")
-            
+            conflicts = list(self.iter_conflicts(local_path, remote_path, rclone_wrapper))
             logger.info(f"Detectados {len(conflicts)} conflictos potenciales")
             return conflicts
             
@@ -185,18 +297,24 @@ class ConflictResolver:
     def _list_local_files(self, path: Path) -> List[Dict]:
         """Lista archivos locales con metadata"""
         files = []
+        root = str(path)
         
         try:
-            for item in path.rglob("*"):
-                if item.is_file():
-                    stat = item.stat()
-                    rel_path = str(item.relative_to(path))
-                    files.append({
-                        "path": rel_path,
-                        "name": item.name,
-                        "size": stat.st_size,
-                        "mtime": stat.st_mtime
-                    })
+            # Recorrido iterativo con scandir: el tipo de cada entrada viene del readdir
+            stack = [root]
+            while stack:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file():
+                            stat = entry.stat()
+                            files.append({
+                                "path": os.path.relpath(entry.path, root),
+                                "name": entry.name,
+                                "size": stat.st_size,
+                                "mtime": stat.st_mtime
+                            })
         except Exception as e:
             logger.error(f"Error listando archivos locales: {e}")
         
@@ -212,14 +330,14 @@ class ConflictResolver:
         Returns:
             Estrategia a aplicar
         """
-        ext = Path(conflict.name).suffix.lower()
+        ext = os.path.splitext(conflict.name)[1].lower()  # Igual que Path.suffix, sin crear Path
         
         # Extensiones que se resuelven automáticamente
-        if ext in self.config.get("auto_resolve_extensions", []):
+        if ext in self._auto_resolve:
             return ConflictStrategy.NEWER
         
         # Extensiones que siempre preguntan
-        if ext in self.config.get("always_ask_extensions", []):
+        if ext in self._always_ask:
             return ConflictStrategy.ASK
         
         # Estrategia por defecto
@@ -281,12 +399,14 @@ class ConflictResolver:
         """Añade una extensión para resolver automáticamente"""
         if extension not in self.config["auto_resolve_extensions"]:
             self.config["auto_resolve_extensions"].append(extension)
+            self._refresh_extension_sets()
             self._save_config()
     
     def add_always_ask_extension(self, extension: str):
         """Añade una extensión que siempre pregunta"""
         if extension not in self.config["always_ask_extensions"]:
             self.config["always_ask_extensions"].append(extension)
+            self._refresh_extension_sets()
             self._save_config()
     
     def log_resolution(self, conflict: ConflictFile, action: str, strategy: str):
@@ -300,35 +420,12 @@ class ConflictResolver:
             "remote_size": conflict.remote_size
         }
         
-        history = self.config.get("conflict_history", [])
-        history.append(entry)
-        
-        # Mantener solo últimos 100 registros
-        self.config["conflict_history"] = history[-100:]
-        self._save_config()
+        self._append_history(entry)
     
     def get_conflict_stats(self) -> Dict:
         """Obtiene estadísticas de conflictos resueltos"""
-        history = self.config.get("conflict_history", [])
-        
-        if not history:
-            return {
-                "total": 0,
-                "by_action": {},
-                "by_strategy": {}
-            }
-        
-        stats = {
-            "total": len(history),
-            "by_action": {},
-            "by_strategy": {}
+        return {
+            "total": len(self._history),
+            "by_action": dict(self._action_counter),
+            "by_strategy": dict(self._strategy_counter)
         }
-        
-        for entry in history:
-            action = entry.get("action", "unknown")
-            strategy = entry.get("strategy", "unknown")
-            
-            stats["by_action"][action] = stats["by_action"].get(action, 0) + 1
-            stats["by_strategy"][strategy] = stats["by_strategy"].get(strategy, 0) + 1
-        
-        return stats
@@ -7,11 +7,14 @@ similar a .gitignore pero para archivos de sincronización.
 """
 
 import json
+import threading
 from pathlib import Path
-from typing import List, Dict, Set, Optional
+from typing import List, Dict, Set, Optional, Tuple
 from dataclasses import dataclass, field
 from loguru import logger
 
+from ..utils.fileio import atomic_write
+
 
 @dataclass
 class FilterPreset:
@@ -105,6 +108,9 @@ class FilterManager:
     en la sincronización, similar a .gitignore.
     """
     
+    # Segundos de espera antes de escribir filters.json (agrupa cambios seguidos)
+    SAVE_DELAY = 0.5
+    
     def __init__(self, config_path: Optional[Path] = None):
         """
         Inicializa el gestor de filtros.
@@ -114,6 +120,16 @@ class FilterManager:
         """
         self.config_path = config_path or Path.home() / ".config" / "lxdrive" / "filters.json"
         self.filters = self._load_filters()
+        # Patrones y argumentos ya calculados por (tipo, cuenta); se vacía en cada cambio
+        self._cache: Dict[Tuple[str, Optional[str]], List[str]] = {}
+        
+        # Guardado diferido
+        self._dirty = False
+        self._save_timer: Optional[threading.Timer] = None
+        self._save_lock = threading.Lock()
+        # Protege self.filters: la interfaz lo modifica mientras el temporizador
+        # de guardado lo serializa en otro hilo
+        self._filters_lock = threading.Lock()
     
     def _load_filters(self) -> Dict:
         """Carga los filtros desde el archivo de configuración"""
@@ -139,13 +155,73 @@ class FilterManager:
     def _save_filters(self):
         """Guarda los filtros en el archivo de configuración"""
         try:
+            with self._filters_lock:
+                data = json.dumps(self.filters, indent=2)
             self.config_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.config_path, 'w') as f:
-                json.dump(self.filters, f, indent=2)
+            atomic_write(self.config_path, data.encode("utf-8"))
             logger.info("Filtros guardados correctamente")
         except Exception as e:
             logger.error(f"Error guardando filtros: {e}")
     
+    def _mark_dirty(self):
+        """Marca los filtros como modificados (sin programar el guardado)"""
+        # Todos los cambios pasan por aquí: invalidar lo calculado
+        self._cache.clear()
+        with self._save_lock:
+            self._dirty = True
+    
+    def _schedule_save(self):
+        """Marca los filtros como modificados y programa el guardado diferido"""
+        self._mark_dirty()
+        with self._save_lock:
+            if self._save_timer:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(self.SAVE_DELAY, self.flush)
+            # No daemon: al salir el intérprete espera al guardado pendiente
+            # (como mucho SAVE_DELAY) en vez de perder los cambios
+            self._save_timer.daemon = False
+            self._save_timer.start()
+    
+    def flush(self):
+        """Escribe inmediatamente los cambios pendientes"""
+        with self._save_lock:
+            if self._save_timer:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if not self._dirty:
+                return
+            self._dirty = False
+            self._save_filters()
+    
+    def _add_patterns(self, key: str, patterns: List[str]) -> List[str]:
+        """
+        Añade patrones nuevos a una lista global conservando su orden.
+        
+        La pertenencia se comprueba contra un set, así añadir N patrones es
+        O(N) en lugar de O(N²). No guarda: el llamador lo hace una vez.
+        
+        Returns:
+            Patrones realmente añadidos (sin los ya existentes)
+        """
+        with self._filters_lock:
+            target = self.filters[key]
+            present = set(target)
+            added = []
+            for pattern in patterns:
+                if pattern not in present:
+                    present.add(pattern)
+                    target.append(pattern)
+                    added.append(pattern)
+        return added
+    
+    def _remove_item(self, key: str, item: str) -> bool:
+        """Quita un elemento de una lista de self.filters; True si estaba"""
+        with self._filters_lock:
+            if item not in self.filters[key]:
+                return False
+            self.filters[key].remove(item)
+        return True
+    
     def add_global_exclude(self, pattern: str):
         """
         Añade un patrón de exclusión global.
@@ -153,16 +229,14 @@ class FilterManager:
         Args:
             pattern: Patrón a excluir (formato glob)
         """
-        if pattern not in self.filters["global_exclude"]:
-            self.filters["global_exclude"].append(pattern)
-            self._save_filters()
+        if self._add_patterns("global_exclude", [pattern]):
+            self._schedule_save()
             logger.info(f"Patrón de exclusión añadido: {pattern}")
     
     def remove_global_exclude(self, pattern: str):
         """Elimina un patrón de exclusión global"""
-        if pattern in self.filters["global_exclude"]:
-            self.filters["global_exclude"].remove(pattern)
-            self._save_filters()
+        if self._remove_item("global_exclude", pattern):
+            self._schedule_save()
             logger.info(f"Patrón de exclusión eliminado: {pattern}")
     
     def add_global_include(self, pattern: str):
@@ -174,16 +248,14 @@ class FilterManager:
         Args:
             pattern: Patrón a incluir (formato glob)
         """
-        if pattern not in self.filters["global_include"]:
-            self.filters["global_include"].append(pattern)
-            self._save_filters()
+        if self._add_patterns("global_include", [pattern]):
+            self._schedule_save()
             logger.info(f"Patrón de inclusión añadido: {pattern}")
     
     def remove_global_include(self, pattern: str):
         """Elimina un patrón de inclusión global"""
-        if pattern in self.filters["global_include"]:
-            self.filters["global_include"].remove(pattern)
-            self._save_filters()
+        if self._remove_item("global_include", pattern):
+            self._schedule_save()
             logger.info(f"Patrón de inclusión eliminado: {pattern}")
     
     def set_account_filters(
@@ -200,11 +272,12 @@ class FilterManager:
             exclude: Lista de patrones a excluir
             include: Lista de patrones a incluir
         """
-        self.filters["account_filters"][account_id] = {
-            "exclude": exclude,
-            "include": include
-        }
-        self._save_filters()
+        with self._filters_lock:
+            self.filters["account_filters"][account_id] = {
+                "exclude": list(exclude),
+                "include": list(include)
+            }
+        self._schedule_save()
         logger.info(f"Filtros actualizados para cuenta: {account_id}")
     
     def get_account_filters(self, account_id: str) -> Dict[str, List[str]]:
@@ -233,16 +306,14 @@ class FilterManager:
             logger.warning(f"Preset no encontrado: {preset_name}")
             return
         
-        if preset_name not in self.filters["enabled_presets"]:
-            self.filters["enabled_presets"].append(preset_name)
-            self._save_filters()
+        if self._add_patterns("enabled_presets", [preset_name]):
+            self._schedule_save()
             logger.info(f"Preset habilitado: {preset_name}")
     
     def disable_preset(self, preset_name: str):
         """Deshabilita un preset de filtros"""
-        if preset_name in self.filters["enabled_presets"]:
-            self.filters["enabled_presets"].remove(preset_name)
-            self._save_filters()
+        if self._remove_item("enabled_presets", preset_name):
+            self._schedule_save()
             logger.info(f"Preset deshabilitado: {preset_name}")
     
     def get_enabled_presets(self) -> List[FilterPreset]:
@@ -263,6 +334,11 @@ class FilterManager:
         Returns:
             Lista de patrones de exclusión
         """
+        key = ("exclude", account_id)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return list(cached)
+        
         patterns = set(self.filters["global_exclude"])
         
         # Añadir patrones de presets habilitados
@@ -274,6 +350,7 @@ class FilterManager:
             account_filters = self.get_account_filters(account_id)
             patterns.update(account_filters["exclude"])
         
+        self._cache[key] = list(patterns)
         return list(patterns)
     
     def get_all_include_patterns(self, account_id: Optional[str] = None) -> List[str]:
@@ -286,6 +363,11 @@ class FilterManager:
         Returns:
             Lista de patrones de inclusión
         """
+        key = ("include", account_id)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return list(cached)
+        
         patterns = set(self.filters["global_include"])
         
         # Añadir patrones específicos de cuenta
@@ -293,6 +375,7 @@ class FilterManager:
             account_filters = self.get_account_filters(account_id)
             patterns.update(account_filters["include"])
         
+        self._cache[key] = list(patterns)
         return list(patterns)
     
     def to_rclone_args(self, account_id: Optional[str] = None) -> List[str]:
@@ -305,6 +388,11 @@ class FilterManager:
         Returns:
             Lista de argumentos para rclone
         """
+        key = ("args", account_id)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return list(cached)
+        
         args = []
         
         # Patrones de exclusión
@@ -315,7 +403,8 @@ class FilterManager:
         for pattern in self.get_all_include_patterns(account_id):
             args.extend(["--include", pattern])
         
-        return args
+        self._cache[key] = args
+        return list(args)
     
     def import_from_gitignore(self, gitignore_path: Path) -> int:
         """
@@ -332,6 +421,8 @@ class FilterManager:
             return 0
         
         imported = 0
+        excludes: List[str] = []
+        includes: List[str] = []
         try:
             with open(gitignore_path) as f:
                 for line in f:
@@ -343,13 +434,19 @@ class FilterManager:
                     
                     # Manejar negaciones (!)
                     if line.startswith('!'):
-                        pattern = line[1:]
-                        self.add_global_include(pattern)
+                        includes.append(line[1:])
                     else:
-                        self.add_global_exclude(line)
+                        excludes.append(line)
                     
                     imported += 1
             
+            # Añadir todo de una vez y guardar una sola vez
+            added = self._add_patterns("global_exclude", excludes)
+            added += self._add_patterns("global_include", includes)
+            if added:
+                self._mark_dirty()
+                self.flush()
+            
             logger.info(f"Importados {imported} patrones desde {gitignore_path}")
             return imported
             
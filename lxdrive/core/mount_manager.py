@@ -9,6 +9,8 @@ como unidades de disco usando rclone mount.
 import subprocess
 import os
 import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, Dict, List, Tuple
 from dataclasses import dataclass
@@ -54,6 +56,9 @@ class MountManager:
         # Procesos de montaje activos: account_id -> proceso
         self._mount_processes: Dict[str, subprocess.Popen] = {}
         
+        # Serializa el guardado de cuentas al montar/desmontar en paralelo
+        self._lock = threading.Lock()
+        
         # Directorio base para puntos de montaje
         self.mount_base_dir = Path.home() / "CloudDrives"
         self._ensure_mount_dir()
@@ -160,8 +165,7 @@ class MountManager:
             time.sleep(3.0) # Increased wait time for slower mounts
             
             if self.is_mounted(account_id):
-                account.mount_enabled = True
-                self.account_manager.update(account)
+                self._set_mount_enabled(account, True)
                 # Notificación retardada para asegurar que la UI esté lista
                 # QTimer.singleShot(500, lambda: self._emit_activity(account_id, "Sistema", "mounted", "Unidad VFS Lista"))
                 self._emit_activity(account_id, "Sistema", "mounted", "Unidad VFS Lista")
@@ -219,8 +223,9 @@ class MountManager:
                         if len(parts) >= 2:
                             msg_part = parts[1]
                             # En modo DEBUG el path suele ir antes de ": Open:" o similar
-                            if ":" in msg_part:
-                                filename = msg_part.split(":")[0].strip()
+                            head, sep, _ = msg_part.partition(":")
+                            if sep:
+                                filename = head.strip()
 
                     # 3. Validar y notificar
                     if filename and len(filename) > 1 and "vfs cache" not in filename.lower():
@@ -261,6 +266,12 @@ class MountManager:
         """Configura el callback para recibir eventos de actividad"""
         self.on_activity_callback = callback
 
+    def _set_mount_enabled(self, account: Account, enabled: bool):
+        """Persiste el estado de montaje (serializado entre hilos)"""
+        with self._lock:
+            account.mount_enabled = enabled
+            self.account_manager.update(account)
+
     def unmount(self, account_id: str) -> Tuple[bool, str]:
         """
         Desmonta una cuenta.
@@ -273,10 +284,9 @@ class MountManager:
         try:
             # Intentar fusermount -u
             subprocess.run(["fusermount", "-uz", str(mount_point)], 
-                         check=True, capture_output=True)
+                         check=True, capture_output=True, timeout=5)
             
-            account.mount_enabled = False
-            self.account_manager.update(account)
+            self._set_mount_enabled(account, False)
             # Remove the empty directory to keep things clean
             try:
                 mount_point.rmdir()
@@ -287,9 +297,8 @@ class MountManager:
             # Si falla, intentar umount normal
             try:
                 subprocess.run(["umount", str(mount_point)], 
-                             check=True, capture_output=True)
-                account.mount_enabled = False
-                self.account_manager.update(account)
+                             check=True, capture_output=True, timeout=5)
+                self._set_mount_enabled(account, False)
                 try:
                     mount_point.rmdir()
                 except:
@@ -298,8 +307,7 @@ class MountManager:
             except Exception as e2:
                 # Si rclone ya no está o el punto no está, forzamos el estado a desconectado
                 if not self.is_mounted(account_id):
-                    account.mount_enabled = False
-                    self.account_manager.update(account)
+                    self._set_mount_enabled(account, False)
                     try:
                         if mount_point.exists():
                              mount_point.rmdir()
@@ -370,14 +378,20 @@ class MountManager:
         """
         Monta todas las cuentas configuradas para montaje.
         
+        Los montajes se lanzan en paralelo: cada uno espera a que FUSE
+        se estabilice, así el tiempo total es el del más lento.
+        
         Returns:
             Número de cuentas montadas exitosamente
         """
-        mounted_count = 0
+        account_ids = [account.id for account in self.account_manager.get_mount_accounts()]
+        if not account_ids:
+            return 0
         
-        for account in self.account_manager.get_mount_accounts():
-            if self.mount(account.id):
-                mounted_count += 1
+        with ThreadPoolExecutor(max_workers=min(8, len(account_ids))) as executor:
+            results = list(executor.map(self.mount, account_ids))
+        
+        mounted_count = sum(1 for success, _ in results if success)
         
         logger.info(f"Montadas {mounted_count} cuentas")
         return mounted_count
@@ -389,14 +403,18 @@ class MountManager:
         Returns:
             Número de cuentas desmontadas exitosamente
         """
-        unmounted_count = 0
-        
         # Iterar sobre todas las cuentas para asegurar limpieza total
-        for account in self.account_manager.get_all():
-            if self.is_mounted(account.id):
-                success, _ = self.unmount(account.id)
-                if success:
-                    unmounted_count += 1
+        account_ids = [
+            account.id for account in self.account_manager.get_all()
+            if self.is_mounted(account.id)
+        ]
+        
+        # Desmontar en paralelo: el cierre tarda lo que el desmontaje más lento
+        unmounted_count = 0
+        if account_ids:
+            with ThreadPoolExecutor(max_workers=min(8, len(account_ids))) as executor:
+                results = list(executor.map(self.unmount, account_ids))
+            unmounted_count = sum(1 for success, _ in results if success)
         
         # Limpiar diccionario de procesos por si acaso
         self._mount_processes.clear()
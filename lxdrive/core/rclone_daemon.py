@@ -10,40 +10,54 @@ import subprocess
 import time
 import signal
 import os
+import re
+import secrets
 from pathlib import Path
 from typing import Optional
 from loguru import logger
 
 
+# Línea con la que rclone anuncia la URL real del servidor RC (útil con puerto 0)
+_SERVING_RE = re.compile(r"Serving remote control on \[?(?P<url>https?://[^\s\]/]+:(?P<port>\d+))")
+
+
 class RcloneDaemon:
     """
     Gestor del daemon rclone rcd.
     
     Inicia y gestiona el servidor RC de rclone en segundo plano
     para permitir acceso a la API de control remoto.
+    
+    El servidor escucha solo en 127.0.0.1 y siempre exige autenticación:
+    sin ella cualquier proceso local (o una página web con un POST a
+    localhost) podría leer los tokens OAuth con config/dump.
     """
     
     def __init__(
         self,
-        port: int = 5572,
+        port: int = 0,
         user: str = "lxdrive",
-        password: str = "lxdrive_rc_2026",
-        config_path: Optional[Path] = None
+        password: Optional[str] = None,
+        config_path: Optional[Path] = None,
+        rclone_path: str = "rclone"
     ):
         """
         Inicializa el gestor del daemon.
         
         Args:
-            port: Puerto para el servidor RC
+            port: Puerto para el servidor RC (0 = lo elige rclone al escuchar)
             user: Usuario para autenticación
-            password: Password para autenticación
+            password: Password para autenticación (por defecto, uno aleatorio por sesión)
             config_path: Ruta al archivo de configuración de rclone
+            rclone_path: Ejecutable de rclone
         """
         self.port = port
         self.user = user
-        self.password = password
+        self.password = password or secrets.token_urlsafe(24)
         self.config_path = config_path or Path.home() / ".config" / "rclone" / "rclone.conf"
+        self.rclone_path = rclone_path
         self.process: Optional[subprocess.Popen] = None
+        self.url: Optional[str] = None
         self.pid_file = Path.home() / ".cache" / "lxdrive" / "rclone_rcd.pid"
         
     def is_running(self) -> bool:
@@ -77,14 +91,20 @@ class RcloneDaemon:
         
         return False
     
-    def start(self) -> bool:
+    def start(self, timeout: float = 5.0) -> bool:
         """
-        Inicia el daemon rclone rcd.
+        Inicia el daemon rclone rcd y espera a que anuncie su URL.
         
+        Solo se reutiliza un proceso iniciado por esta instancia: un rcd de
+        otra sesión tiene otras credenciales y no serviría.
+        
+        Args:
+            timeout: Segundos máximos de espera al arranque
+            
         Returns:
             True si se inició correctamente
         """
-        if self.is_running():
+        if self.process and self.process.poll() is None and self.url:
             logger.info("rclone rcd ya está corriendo")
             return True
         
@@ -92,22 +112,26 @@ class RcloneDaemon:
             # Crear directorio para PID file
             self.pid_file.parent.mkdir(parents=True, exist_ok=True)
             
+            # Un rcd de una sesión anterior que no se cerró limpiamente
+            self._kill_stale()
+            
             # Construir comando
             cmd = [
-                "rclone", "rcd",
-                "--rc-addr", f"localhost:{self.port}",
-                "--rc-no-auth",  # Sin autenticación para localhost
-                "--rc-allow-origin", "*",  # Permitir CORS
+                self.rclone_path, "rcd",
+                "--rc-addr", f"127.0.0.1:{self.port}",
                 "--log-level", "INFO"
             ]
             
             if self.config_path.exists():
                 cmd.extend(["--config", str(self.config_path)])
             
+            # Credenciales por entorno: en la línea de comandos serían visibles con ps
+            env = dict(os.environ, RCLONE_RC_USER=self.user, RCLONE_RC_PASS=self.password)
+            
             # Log file
-            log_file = self.pid_file.parent / "rclone_rcd.log"
+            log_file = self.get_log_path()
             
-            logger.info(f"Iniciando rclone rcd en puerto {self.port}...")
+            logger.info(f"Iniciando rclone rcd en puerto {self.port or 'libre'}...")
             
             # Iniciar proceso en background
             with open(log_file, "w") as log:
@@ -115,22 +139,29 @@ class RcloneDaemon:
                     cmd,
                     stdout=log,
                     stderr=subprocess.STDOUT,
-                    start_new_session=True  # Desacoplar del proceso padre
+                    env=env
                 )
             
             # Guardar PID
             with open(self.pid_file, "w") as f:
                 f.write(str(self.process.pid))
             
-            # Esperar a que inicie
-            max_wait = 5
-            for i in range(max_wait):
-                time.sleep(1)
-                if self.is_running():
-                    logger.info(f"✅ rclone rcd iniciado (PID: {self.process.pid})")
+            # Esperar a que rclone anuncie dónde escucha. Con puerto 0 el puerto lo
+            # reserva rclone al abrir el socket, sin la carrera de reservarlo antes aquí
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                match = _SERVING_RE.search(log_file.read_text(errors="replace"))
+                if match and int(match.group("port")):
+                    self.url = match.group("url")
+                    self.port = int(match.group("port"))
+                    logger.info(f"✅ rclone rcd iniciado en {self.url} (PID: {self.process.pid})")
                     return True
+                if self.process.poll() is not None:
+                    break
+                time.sleep(0.05)
             
-            logger.error("rclone rcd no respondió después de 5 segundos")
+            logger.error(f"rclone rcd no respondió después de {timeout:g} segundos")
+            self.stop()
             return False
             
         except FileNotFoundError:
@@ -140,6 +171,31 @@ class RcloneDaemon:
             logger.error(f"Error iniciando rclone rcd: {e}")
             return False
     
+    def _kill_stale(self):
+        """
+        Termina el rclone rcd registrado en el PID file por otra sesión.
+        
+        Ese daemon sigue teniendo la configuración cargada y acceso RC
+        autenticado aunque ya nadie conozca sus credenciales.
+        """
+        if self.process or not self.pid_file.exists():
+            return
+        
+        try:
+            pid = int(self.pid_file.read_text().strip())
+            # Evitar matar un proceso ajeno que haya reutilizado el PID
+            cmdline = Path(f"/proc/{pid}/cmdline").read_bytes().split(b"\0")
+            if b"rcd" in cmdline:
+                logger.info(f"Deteniendo rclone rcd huérfano (PID: {pid})")
+                os.kill(pid, signal.SIGTERM)
+        except (ValueError, OSError):
+            pass
+        
+        try:
+            self.pid_file.unlink()
+        except OSError:
+            pass
+    
     def stop(self) -> bool:
         """
         Detiene el daemon rclone rcd.
@@ -161,7 +217,17 @@ class RcloneDaemon:
                 with open(self.pid_file) as f:
                     pid = int(f.read().strip())
             
-            if pid:
+            if self.process:
+                # Proceso propio: esperar directamente su salida
+                logger.info(f"Deteniendo rclone rcd (PID: {pid})...")
+                self.process.terminate()
+                try:
+                    self.process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    logger.warning("Forzando detención de rclone rcd...")
+                    self.process.kill()
+                    self.process.wait()
+            elif pid:
                 logger.info(f"Deteniendo rclone rcd (PID: {pid})...")
                 
                 # Intentar detención graceful
@@ -191,6 +257,7 @@ class RcloneDaemon:
                 self.pid_file.unlink()
             
             self.process = None
+            self.url = None
             logger.info("✅ rclone rcd detenido")
             return True
             
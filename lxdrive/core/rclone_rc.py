@@ -15,7 +15,12 @@ from datetime import datetime
 from loguru import logger
 
 
-@dataclass
+class RcloneRCError(Exception):
+    """Error devuelto por la API RC (respuesta distinta de 200)"""
+    pass
+
+
+@dataclass(slots=True)
 class TransferInfo:
     """Información de una transferencia en curso"""
     name: str
@@ -116,6 +121,43 @@ class RcloneRC:
             logger.debug(f"RC no disponible: {e}")
             return False
     
+    def call(
+        self,
+        command: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: float = 30
+    ) -> Dict[str, Any]:
+        """
+        Ejecuta un comando cualquiera de la API RC.
+        
+        Args:
+            command: Comando RC (ej: "config/dump")
+            params: Parámetros JSON del comando
+            timeout: Timeout en segundos
+            
+        Returns:
+            Respuesta JSON del comando
+            
+        Raises:
+            RcloneRCError: Si rclone responde con error
+            requests.RequestException: Si el servidor no responde
+        """
+        response = self.session.post(
+            f"{self.base_url}/{command}",
+            json=params or {},
+            timeout=timeout
+        )
+        
+        try:
+            data = response.json()
+        except ValueError:
+            data = {}
+        
+        if response.status_code != 200:
+            raise RcloneRCError(data.get("error") or response.text or "Error desconocido")
+        
+        return data
+    
     def get_stats(self, group: str = "") -> Optional[TransferStats]:
         """
         Obtiene estadísticas de transferencias.
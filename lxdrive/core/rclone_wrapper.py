@@ -10,18 +10,222 @@ import subprocess
 import json
 import os
 import shutil
+import functools
+import hashlib
+import re
+import tempfile
+import selectors
+import threading
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Tuple, Callable
+from types import MappingProxyType
+from typing import Optional, List, Dict, Any, Tuple, Callable, Iterator
 from dataclasses import dataclass
 from enum import Enum
 from loguru import logger
 
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+try:
+    import requests
+    from .rclone_rc import RcloneRC, RcloneRCError
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+from .rclone_daemon import RcloneDaemon
+from ..utils.fileio import atomic_write
+from ..utils.jsonio import json_loads
+
+
+@functools.lru_cache(maxsize=1)
+def _locate_rclone() -> Optional[str]:
+    """Busca el ejecutable de rclone (una sola vez por proceso)"""
+    rclone = shutil.which("rclone")
+    if rclone:
+        logger.debug(f"rclone encontrado en: {rclone}")
+        return rclone
+    
+    # Buscar en ubicaciones comunes
+    common_paths = (
+        "/usr/bin/rclone",
+        "/usr/local/bin/rclone",
+        os.path.expanduser("~/.local/bin/rclone")
+    )
+    
+    for path in common_paths:
+        if os.path.isfile(path):
+            logger.debug(f"rclone encontrado en: {path}")
+            return path
+    
+    return None
+
+
+def _parse_json_log(line: bytes) -> Tuple[Optional[Dict[str, Any]], str]:
+    """
+    Interpreta una línea (en bytes) de `rclone --use-json-log`.
+    
+    Los registros JSON se parsean directamente desde los bytes, sin pasar
+    antes por un str intermedio.
+    
+    Returns:
+        Tupla (registro, línea en el formato de texto de rclone). Las
+        líneas que no son JSON se devuelven decodificadas y sin registro.
+    """
+    record = None
+    if line.startswith(b"{"):
+        try:
+            record = json_loads(line)
+        except ValueError:
+            record = None
+    if not isinstance(record, dict):
+        return None, line.decode("utf-8", errors="replace") + "\n"
+    
+    level = str(record.get("level", "info")).upper()
+    msg = str(record.get("msg", "")).rstrip("\n")
+    obj = record.get("object")
+    text = f"{level:<6}: {obj}: {msg}" if obj else f"{level:<6}: {msg}"
+    return record, text + "\n"
+
+
+# Lanzar rclone por la vía rápida de subprocess (posix_spawn/vfork) en lugar
+# de fork(), que duplica el mapa de memoria de la aplicación Qt. Los
+# descriptores abiertos por Python no son heredables (PEP 446), así que no
+# hace falta close_fds para aislarlos del proceso hijo.
+_SPAWN_KWARGS: Dict[str, Any] = {"close_fds": False}
+
+
+# Argumentos fijos de bisync, construidos una sola vez
+_BISYNC_FLAGS = (
+    "--verbose",
+    "--stats", "1s",
+    "--stats-one-line",
+    "--conflict-resolve", "newer"  # El archivo más reciente siempre gana
+)
+_BISYNC_FLAGS_STREAM = (
+    "--verbose",
+    "--stats", "1s",
+    "--conflict-resolve", "newer",
+    "--resilient",
+    "--force",
+    "--remove-empty-dirs",
+    "--fix-case",
+    "--recover",
+    "--no-cleanup",
+    # Permitir descarga de archivos con 'abuse' (malware detectado por google)
+    "--drive-acknowledge-abuse",
+    # Log estructurado (NDJSON) en lugar de texto libre
+    "--use-json-log"
+)
+_BISYNC_RESYNC = ("--resync", "--ignore-listing-checksum")
+
+# Patrones de error de bisync, compilados una sola vez (una pasada por stderr)
+AUTH_ERRORS = ("expired", "token", "authorize", "401 Unauthorized", "login")
+RESYNC_TRIGGERS = ("resync", "prior sync", "cannot find prior", "listings", "aborted", "recovery")
+
+_AUTH_ERROR_RE = re.compile("|".join(map(re.escape, AUTH_ERRORS)), re.IGNORECASE)
+_RESYNC_TRIGGER_RE = re.compile("|".join(map(re.escape, RESYNC_TRIGGERS)), re.IGNORECASE)
+
 
 class RcloneError(Exception):
     """Excepción personalizada para errores de rclone"""
     pass
 
 
+# Última línea de un stream cancelado con stop(): no es un error de rclone
+STREAM_CANCELLED = "CANCELLED: Comando cancelado"
+# Prefijo de la última línea de un stream cuyo proceso salió con error
+_STREAM_EXIT_ERROR = "ERROR: El proceso terminó con código"
+
+
+class CommandStream:
+    """
+    Salida de un comando rclone en curso, leída línea a línea.
+    
+    La lectura se hace con un selector sobre el pipe de stdout y un pipe
+    de aviso, de modo que stop() puede cancelarla desde otro hilo aunque
+    rclone lleve tiempo sin emitir nada. Un stream cancelado termina con la
+    línea STREAM_CANCELLED en lugar de la de código de salida.
+    """
+    
+    def __init__(self, process: subprocess.Popen):
+        self.process = process
+        self._wake_r, self._wake_w = os.pipe()
+        self._wake_lock = threading.Lock()
+        self._stopped = False
+        self._closed = False
+    
+    @property
+    def cancelled(self) -> bool:
+        """True si la lectura se canceló con stop()"""
+        return self._stopped
+    
+    def stop(self):
+        """Cancela la lectura y termina el proceso rclone"""
+        with self._wake_lock:
+            if self._stopped or self._closed:
+                return
+            self._stopped = True
+            os.write(self._wake_w, b"\0")
+    
+    def __iter__(self) -> Iterator[str]:
+        for line in self.iter_lines():
+            yield line.decode("utf-8", errors="replace") + "\n"
+    
+    def iter_lines(self) -> Iterator[bytes]:
+        """Líneas sin decodificar y sin el salto de línea final"""
+        assert self.process.stdout is not None
+        fd = self.process.stdout.fileno()
+        
+        selector = selectors.DefaultSelector()
+        selector.register(fd, selectors.EVENT_READ)
+        selector.register(self._wake_r, selectors.EVENT_READ)
+        
+        buffer = b""
+        eof = False
+        try:
+            while not eof and not self._stopped:
+                for key, _ in selector.select(timeout=1.0):
+                    if key.fd == self._wake_r:
+                        break
+                    
+                    chunk = os.read(fd, 65536)
+                    if not chunk:
+                        eof = True
+                        break
+                    
+                    *lines, buffer = (buffer + chunk).split(b"\n")
+                    yield from lines
+            
+            if buffer and not self._stopped:
+                yield buffer
+        finally:
+            selector.close()
+            if self.process.poll() is None and not eof:
+                self.process.terminate()
+            self.process.stdout.close()
+            with self._wake_lock:
+                self._closed = True
+                os.close(self._wake_r)
+                os.close(self._wake_w)
+        
+        try:
+            return_code = self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            return_code = self.process.wait()
+        
+        if self._stopped:
+            logger.info("Comando stream cancelado")
+            yield STREAM_CANCELLED.encode()
+        elif return_code != 0:
+            logger.warning(f"Comando stream terminó con código: {return_code}")
+            yield f"{_STREAM_EXIT_ERROR} {return_code}".encode()
+
+
 class RemoteType(Enum):
     """Tipos de remotes soportados"""
     GOOGLE_DRIVE = "drive"
@@ -32,14 +236,16 @@ class RemoteType(Enum):
     
     @classmethod
     def get_display_name(cls, remote_type: "RemoteType") -> str:
-        names = {
-            cls.GOOGLE_DRIVE: "Google Drive",
-            cls.DROPBOX: "Dropbox",
-            cls.ONEDRIVE: "OneDrive",
-            cls.NEXTCLOUD: "Nextcloud/WebDAV",
-            cls.PCLOUD: "pCloud"
-        }
-        return names.get(remote_type, remote_type.value)
+        return _REMOTE_TYPE_DISPLAY.get(remote_type, remote_type.value)
+
+
+_REMOTE_TYPE_DISPLAY = MappingProxyType({
+    RemoteType.GOOGLE_DRIVE: "Google Drive",
+    RemoteType.DROPBOX: "Dropbox",
+    RemoteType.ONEDRIVE: "OneDrive",
+    RemoteType.NEXTCLOUD: "Nextcloud/WebDAV",
+    RemoteType.PCLOUD: "pCloud"
+})
 
 
 @dataclass
@@ -58,7 +264,7 @@ class RemoteInfo:
         }
 
 
-@dataclass 
+@dataclass(slots=True)
 class FileInfo:
     """Información de un archivo/carpeta remoto"""
     path: str
@@ -92,89 +298,289 @@ class RcloneWrapper:
         self.config_path = config_path or Path.home() / ".config" / "rclone" / "rclone.conf"
         self.rclone_path = self._find_rclone()
         
+        # Estado cacheado: no cambia durante la sesión en la práctica
+        self._installed = self.rclone_path is not None
+        self._version: Optional[str] = None
+        self._have_config = bool(self.config_path) and self.config_path.exists()
+        
+        # Daemon rclone rcd persistente para consultas rápidas (JSON-RPC). Arranca
+        # en segundo plano; mientras no esté listo se usa la línea de comandos
+        self._rcd: Optional[RcloneDaemon] = None
+        self._rc: Optional["RcloneRC"] = None
+        self._rcd_lock = threading.Lock()
+        self._rcd_starting = False
+        self._rcd_failed = False
+        
+        # Streams de rclone en curso (cancelables con stop_streams)
+        self._active_streams: set = set()
+        
+        # Caché de `config dump`: (st_mtime_ns del archivo de config, dict)
+        self._config_cache: Optional[Tuple[Optional[int], Dict[str, Any]]] = None
+        
+        # Directorio de listings y locks de rclone bisync (resuelto una sola vez)
+        self._bisync_cache_dir = Path.home() / ".cache" / "rclone" / "bisync"
+        
+        # Índice persistente de pares bisync ya inicializados: {clave: {listing, mtime}}
+        self._bisync_index_path = Path.home() / ".config" / "lxdrive" / "bisync_index.json"
+        self._bisync_index: Dict[str, Dict[str, Any]] = self._load_bisync_index()
+        # Varios pares sincronizan en paralelo y todos registran en el índice
+        self._bisync_index_lock = threading.Lock()
+        
         if not self.rclone_path:
             logger.warning("rclone no está instalado en el sistema")
     
+    def _load_bisync_index(self) -> Dict[str, Dict[str, Any]]:
+        """Carga el índice de tracking de bisync desde disco"""
+        try:
+            with open(self._bisync_index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            return index if isinstance(index, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Índice de bisync ilegible, se reconstruirá: {e}")
+            return {}
+    
+    def _save_bisync_index(self):
+        """Guarda el índice de tracking de bisync de forma atómica (llamar con el lock)"""
+        try:
+            self._bisync_index_path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write(self._bisync_index_path, json.dumps(self._bisync_index, indent=2).encode("utf-8"))
+        except OSError as e:
+            logger.error(f"Error guardando índice de bisync: {e}")
+    
+    @staticmethod
+    def _bisync_key(path1: str, path2: str) -> str:
+        """Clave estable para un par de rutas bisync"""
+        return hashlib.blake2b(f"{path1}\x00{path2}".encode(), digest_size=16).hexdigest()
+    
+    @staticmethod
+    def _bisync_track_name(path1: str, path2: str) -> str:
+        """Prefijo con el que rclone nombra los listings: <path1>..<path2>.path{1,2}.lst"""
+        return f"{path1}..{path2}".replace("/", "_").replace(":", "_")
+    
+    def _has_bisync_tracking(self, path1: str, path2: str) -> bool:
+        """
+        Indica si el par ya tiene listings de bisync (no necesita --resync).
+        
+        Consulta el índice y, si el par no está, comprueba una sola vez el
+        listing esperado en disco (pares inicializados antes de existir el
+        índice o por otra vía) y lo registra.
+        """
+        if self._bisync_key(path1, path2) in self._bisync_index:
+            return True
+        
+        listing = self._bisync_cache_dir / f"{self._bisync_track_name(path1, path2)}.path1.lst"
+        if not listing.exists():
+            return False
+        
+        self._record_bisync_tracking(path1, path2)
+        return True
+    
+    def _record_bisync_tracking(self, path1: str, path2: str):
+        """Registra en el índice que el par ya tiene listings de bisync"""
+        bisync_cache = self._bisync_cache_dir
+        track_name = self._bisync_track_name(path1, path2)
+        mtime = None
+        for suffix in (".path1.lst", ".path2.lst"):
+            try:
+                st_mtime = os.stat(bisync_cache / f"{track_name}{suffix}").st_mtime
+            except OSError:
+                continue
+            mtime = st_mtime if mtime is None else max(mtime, st_mtime)
+        
+        with self._bisync_index_lock:
+            self._bisync_index[self._bisync_key(path1, path2)] = {
+                "listing": f"{track_name}.path1.lst",
+                "mtime": mtime
+            }
+            self._save_bisync_index()
+    
+    def _forget_bisync_tracking(self, path1: str, path2: str):
+        """Elimina un par del índice (sus listings ya no son válidos)"""
+        with self._bisync_index_lock:
+            if self._bisync_index.pop(self._bisync_key(path1, path2), None) is not None:
+                self._save_bisync_index()
+    
     def _find_rclone(self) -> Optional[str]:
         """Busca el ejecutable de rclone en el sistema"""
-        rclone = shutil.which("rclone")
-        if rclone:
-            logger.debug(f"rclone encontrado en: {rclone}")
-            return rclone
-        
-        # Buscar en ubicaciones comunes
-        common_paths = [
-            "/usr/bin/rclone",
-            "/usr/local/bin/rclone",
-            Path.home() / ".local" / "bin" / "rclone"
-        ]
-        
-        for path in common_paths:
-            if Path(path).exists():
-                logger.debug(f"rclone encontrado en: {path}")
-                return str(path)
-        
-        return None
+        return _locate_rclone()
     
     def is_installed(self) -> bool:
         """Verifica si rclone está instalado"""
-        return self.rclone_path is not None
+        return self._installed
     
     def get_version(self) -> Optional[str]:
-        """Obtiene la versión de rclone instalada"""
-        if not self.is_installed():
+        """Obtiene la versión de rclone instalada (cacheada tras la primera consulta)"""
+        if not self._installed:
             return None
         
+        if self._version is not None:
+            return self._version
+        
         try:
             result = self._run_command(["version"])
             # La primera línea contiene "rclone vX.X.X"
             first_line = result.stdout.split("\n")[0]
-            return first_line.replace("rclone ", "").strip()
+            self._version = first_line.replace("rclone ", "").strip()
+            return self._version
         except RcloneError:
             return None
     
 
+    def _build_command(self, args: List[str]) -> List[str]:
+        """Construye la línea de comandos completa de rclone"""
+        assert self.rclone_path is not None
+        cmd = [self.rclone_path] + args
+        
+        # Añadir configuración personalizada si existe
+        if self._have_config:
+            cmd.extend(["--config", str(self.config_path)])
+        
+        return cmd
+
+    def _ensure_rcd(self) -> Optional["RcloneRC"]:
+        """
+        Devuelve el cliente RC si el daemon ya está listo.
+        
+        Nunca bloquea: la primera llamada lanza el arranque de rclone rcd en
+        un hilo aparte y devuelve None, así el llamador (a menudo el hilo de
+        la interfaz) usa la línea de comandos mientras tanto.
+        
+        Returns:
+            Cliente RC o None si el daemon no está disponible (todavía)
+        """
+        if not self._installed or not REQUESTS_AVAILABLE or self._rcd_failed:
+            return None
+        
+        rc = self._rc
+        if rc is not None:
+            return rc
+        
+        with self._rcd_lock:
+            if not self._rcd_starting:
+                self._rcd_starting = True
+                threading.Thread(target=self._start_rcd, name="lxdrive-rcd", daemon=True).start()
+        return None
+
+    def _start_rcd(self):
+        """Inicia rclone rcd con credenciales aleatorias de esta sesión (en segundo plano)"""
+        assert self.rclone_path is not None
+        daemon = RcloneDaemon(
+            config_path=self.config_path,
+            rclone_path=self.rclone_path
+        )
+        
+        if daemon.start():
+            rc = RcloneRC(
+                host="127.0.0.1",
+                port=daemon.port,
+                user=daemon.user,
+                password=daemon.password
+            )
+            if rc.is_available():
+                with self._rcd_lock:
+                    # shutdown() durante el arranque: no dejar el daemon huérfano
+                    published = not self._rcd_failed
+                    if published:
+                        self._rcd = daemon
+                        self._rc = rc
+                if published:
+                    return
+            daemon.stop()
+            if self._rcd_failed:
+                return
+        
+        logger.warning("rclone rcd no disponible, se usará la línea de comandos")
+        self._rcd_failed = True
+
+    def _rc_call(
+        self,
+        command: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: float = 30
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Ejecuta un comando de la API RC sobre el daemon persistente.
+        
+        Args:
+            command: Comando RC (ej: "config/dump")
+            params: Parámetros JSON del comando
+            timeout: Timeout en segundos
+            
+        Returns:
+            Respuesta JSON, o None si el daemon no está disponible
+            
+        Raises:
+            RcloneError: Si el comando falla
+        """
+        rc = self._ensure_rcd()
+        if rc is None:
+            return None
+        
+        try:
+            return rc.call(command, params, timeout=timeout)
+        except RcloneRCError as e:
+            raise RcloneError(str(e))
+        except requests.Timeout:
+            raise RcloneError(f"Timeout ejecutando: {command}")
+        except requests.RequestException as e:
+            logger.warning(f"rclone rcd no disponible ({e}), se usará la línea de comandos")
+            return None
+
+    def shutdown(self):
+        """Detiene el daemon rclone rcd si se inició"""
+        with self._rcd_lock:
+            daemon = self._rcd
+            self._rcd = None
+            self._rc = None
+            # Un arranque aún en curso no debe publicar el daemon tras el cierre
+            self._rcd_failed = True
+        
+        if daemon:
+            daemon.stop()
+            logger.debug("rclone rcd detenido")
+
     def _run_command_stream(
         self,
-        args: List[str]
+        args: List[str],
+        raw: bool = False
     ):
         """
         Ejecuta un comando rclone y devuelve un generador para su salida.
 
         Args:
             args: Lista de argumentos para rclone
+            raw: Si es True, devuelve las líneas en bytes sin decodificar
 
         Yields:
             Cada línea de la salida (stdout y stderr combinados)
         """
-        if not self.is_installed():
+        if not self._installed:
             raise RcloneError("rclone no está instalado")
 
-        assert self.rclone_path is not None
-        cmd = [self.rclone_path] + args
-        if self.config_path and self.config_path.exists():
-            cmd.extend(["--config", str(self.config_path)])
-            
+        cmd = self._build_command(args)
         logger.debug(f"Streaming: {' '.join(cmd)}")
         
         process = subprocess.Popen(
             cmd,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1,
-            universal_newlines=True
+            bufsize=0,
+            **_SPAWN_KWARGS
         )
 
-        assert process.stdout is not None
-        for line in process.stdout:
-            yield line
-            
-        process.stdout.close()
-        return_code = process.wait()
-        if return_code != 0:
-            logger.warning(f"Comando stream terminó con código: {return_code}")
-            yield f"ERROR: El proceso terminó con código {return_code}"
+        stream = CommandStream(process)
+        self._active_streams.add(stream)
+        try:
+            yield from (stream.iter_lines() if raw else stream)
+        finally:
+            self._active_streams.discard(stream)
+
+    def stop_streams(self):
+        """Cancela todos los comandos stream en curso"""
+        for stream in list(self._active_streams):
+            stream.stop()
 
     def _run_command(
         self,
@@ -196,16 +602,10 @@ class RcloneWrapper:
         Raises:
             RcloneError: Si el comando falla
         """
-        if not self.is_installed():
+        if not self._installed:
             raise RcloneError("rclone no está instalado")
 
-        assert self.rclone_path is not None
-        cmd = [self.rclone_path] + args
-        
-        # Añadir configuración personalizada si existe
-        if self.config_path and self.config_path.exists():
-            cmd.extend(["--config", str(self.config_path)])
-        
+        cmd = self._build_command(args)
         logger.debug(f"Ejecutando: {' '.join(cmd)}")
         
         try:
@@ -213,13 +613,14 @@ class RcloneWrapper:
                 cmd,
                 capture_output=capture_output,
                 text=True,
-                timeout=timeout
+                timeout=timeout,
+                **_SPAWN_KWARGS
             )
             
             if result.returncode != 0:
                 error_msg = result.stderr or result.stdout or "Error desconocido"
                 # Si es un error de bisync que ya manejamos, no logger como error crítico aquí
-                if "bisync" not in str(args):
+                if args and args[0] != "bisync":
                     logger.error(f"Error en rclone: {error_msg}")
                 raise RcloneError(error_msg)
             
@@ -239,6 +640,84 @@ class RcloneWrapper:
         result = self._run_command(args)
         return result.stdout
 
+    def _run_command_bytes(
+        self,
+        args: List[str],
+        timeout: Optional[int] = None
+    ) -> bytes:
+        """
+        Ejecuta un comando rclone y devuelve stdout sin decodificar.
+        
+        Para salidas JSON grandes: se evita la copia intermedia en str y
+        el bytes resultante se pasa directamente al parser.
+        
+        Args:
+            args: Lista de argumentos para rclone
+            timeout: Timeout en segundos
+            
+        Returns:
+            Salida estándar en bytes
+            
+        Raises:
+            RcloneError: Si el comando falla
+        """
+        if not self._installed:
+            raise RcloneError("rclone no está instalado")
+        
+        cmd = self._build_command(args)
+        logger.debug(f"Ejecutando: {' '.join(cmd)}")
+        
+        try:
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                **_SPAWN_KWARGS
+            )
+        except FileNotFoundError:
+            raise RcloneError("Ejecutable de rclone no encontrado")
+        
+        try:
+            out, err = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise RcloneError(f"Timeout ejecutando: {' '.join(args)}")
+        
+        if process.returncode != 0:
+            error_msg = err.decode("utf-8", "replace") or "Error desconocido"
+            logger.error(f"Error en rclone: {error_msg}")
+            raise RcloneError(error_msg)
+        
+        return out
+
+    def _config_dump(self) -> Dict[str, Any]:
+        """
+        Devuelve la configuración completa de rclone, parseada una sola vez.
+        
+        Se invalida cuando cambia el mtime del archivo de configuración
+        (rclone lo reescribe también al refrescar tokens OAuth).
+        
+        Raises:
+            RcloneError: Si el comando falla
+            json.JSONDecodeError: Si la salida no es JSON válido
+        """
+        try:
+            mtime: Optional[int] = self.config_path.stat().st_mtime_ns
+        except (OSError, TypeError):
+            mtime = None
+        
+        cache = self._config_cache
+        if cache is not None and mtime is not None and cache[0] == mtime:
+            return cache[1]
+        
+        config = self._rc_call("config/dump")
+        if config is None:
+            config = json_loads(self._run_command_bytes(["config", "dump"]))
+        
+        self._config_cache = (mtime, config)
+        return config
+
     def list_remotes(self) -> List[RemoteInfo]:
         """
         Lista todos los remotes configurados.
@@ -247,24 +726,14 @@ class RcloneWrapper:
             Lista de RemoteInfo con la información de cada remote
         """
         try:
-            result = self._run_command(["listremotes", "--long"])
-            remotes = []
-            
-            for line in result.stdout.strip().split("\n"):
-                if not line.strip():
-                    continue
-                    
-                # Formato: "nombre: tipo"
-                parts = line.split(":")
-                if len(parts) >= 2:
-                    name = parts[0].strip()
-                    remote_type = parts[1].strip()
-                    remotes.append(RemoteInfo(name=name, type=remote_type))
-            
+            remotes = [
+                RemoteInfo(name=name, type=config.get("type", ""))
+                for name, config in self._config_dump().items()
+            ]
             logger.info(f"Encontrados {len(remotes)} remotes configurados")
             return remotes
             
-        except RcloneError as e:
+        except (RcloneError, json.JSONDecodeError) as e:
             logger.error(f"Error listando remotes: {e}")
             return []
     
@@ -279,9 +748,7 @@ class RcloneWrapper:
             Diccionario con la configuración
         """
         try:
-            result = self._run_command(["config", "dump"])
-            config = json.loads(result.stdout)
-            return config.get(remote_name, {})
+            return self._config_dump().get(remote_name, {})
         except (RcloneError, json.JSONDecodeError) as e:
             logger.error(f"Error obteniendo config de {remote_name}: {e}")
             return {}
@@ -315,6 +782,10 @@ class RcloneWrapper:
                 check=True
             )
             
+            # El primer remote crea el archivo de configuración
+            self._have_config = self.config_path.exists()
+            self._config_cache = None
+            
             logger.info(f"Remote '{remote_name}' creado correctamente")
             return True
             
@@ -333,13 +804,126 @@ class RcloneWrapper:
             True si se eliminó correctamente
         """
         try:
-            self._run_command(["config", "delete", remote_name])
+            if self._rc_call("config/delete", {"name": remote_name}) is None:
+                self._run_command(["config", "delete", remote_name])
+            self._config_cache = None
             logger.info(f"Remote '{remote_name}' eliminado")
             return True
         except RcloneError as e:
             logger.error(f"Error eliminando remote: {e}")
             return False
     
+    def _iter_lsjson(
+        self,
+        remote_name: str,
+        path: str = "",
+        recursive: bool = False,
+        timeout: float = 60
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Itera las entradas crudas de `rclone lsjson` a medida que se emiten.
+        
+        Con ijson disponible el JSON se parsea de forma incremental,
+        sin cargar el listado completo en memoria. Si el listado no termina
+        en `timeout` segundos el proceso se mata.
+        
+        Raises:
+            RcloneError: Si el comando falla o excede el timeout
+        """
+        if not self._installed:
+            raise RcloneError("rclone no está instalado")
+        
+        args = ["lsjson", f"{remote_name}:{path}"]
+        if recursive:
+            args.append("--recursive")
+        
+        cmd = self._build_command(args)
+        logger.debug(f"Listando: {' '.join(cmd)}")
+        
+        # stderr a archivo temporal para no bloquear el pipe de stdout
+        with tempfile.TemporaryFile() as stderr_file:
+            try:
+                process = subprocess.Popen(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=stderr_file,
+                    **_SPAWN_KWARGS
+                )
+            except FileNotFoundError:
+                raise RcloneError("Ejecutable de rclone no encontrado")
+            
+            assert process.stdout is not None
+            # Un remote colgado bloquearía la lectura de stdout indefinidamente;
+            # matar el proceso al vencer el plazo desbloquea ambos parsers
+            timed_out = threading.Event()
+            
+            def on_timeout() -> None:
+                if process.poll() is None:
+                    timed_out.set()
+                    process.kill()
+            
+            watchdog = threading.Timer(timeout, on_timeout)
+            watchdog.daemon = True
+            watchdog.start()
+            
+            completed = False
+            try:
+                if IJSON_AVAILABLE:
+                    items = ijson.items(process.stdout, "item", use_float=True)
+                else:
+                    items = json_loads(process.stdout.read())
+                
+                yield from items
+                completed = True
+            except ValueError as e:
+                # json.JSONDecodeError e ijson.JSONError derivan de ValueError
+                if process.wait() == 0:
+                    raise RcloneError(f"Salida JSON inválida: {e}")
+            finally:
+                watchdog.cancel()
+                # Consumidor abandonó el generador antes de terminar
+                if not completed and process.poll() is None:
+                    process.kill()
+                process.stdout.close()
+            
+            if timed_out.is_set():
+                raise RcloneError(f"Timeout ejecutando: {' '.join(args)}")
+            
+            if process.wait() != 0:
+                stderr_file.seek(0)
+                error_msg = stderr_file.read().decode("utf-8", "replace") or "Error desconocido"
+                raise RcloneError(error_msg)
+    
+    def iter_files(
+        self,
+        remote_name: str,
+        path: str = "",
+        recursive: bool = False
+    ) -> Iterator[FileInfo]:
+        """
+        Itera los archivos de un remote a medida que rclone los emite.
+        
+        Args:
+            remote_name: Nombre del remote
+            path: Ruta dentro del remote (vacío = raíz)
+            recursive: Si listar recursivamente
+            
+        Yields:
+            FileInfo por cada archivo/carpeta
+            
+        Raises:
+            RcloneError: Si el comando falla
+        """
+        for item in self._iter_lsjson(remote_name, path, recursive):
+            yield FileInfo(
+                path=item.get("Path", ""),
+                name=item.get("Name", ""),
+                size=item.get("Size", 0),
+                mod_time=item.get("ModTime", ""),
+                is_dir=item.get("IsDir", False),
+                mime_type=item.get("MimeType")
+            )
+    
     def list_files(
         self, 
         remote_name: str, 
@@ -358,29 +942,8 @@ class RcloneWrapper:
             Lista de FileInfo
         """
         try:
-            remote_path = f"{remote_name}:{path}"
-            args = ["lsjson", remote_path]
-            
-            if recursive:
-                args.append("--recursive")
-            
-            result = self._run_command(args, timeout=60)
-            files_data = json.loads(result.stdout)
-            
-            files = []
-            for item in files_data:
-                files.append(FileInfo(
-                    path=item.get("Path", ""),
-                    name=item.get("Name", ""),
-                    size=item.get("Size", 0),
-                    mod_time=item.get("ModTime", ""),
-                    is_dir=item.get("IsDir", False),
-                    mime_type=item.get("MimeType")
-                ))
-            
-            return files
-            
-        except (RcloneError, json.JSONDecodeError) as e:
+            return list(self.iter_files(remote_name, path, recursive))
+        except RcloneError as e:
             logger.error(f"Error listando archivos: {e}")
             return []
     
@@ -462,23 +1025,9 @@ class RcloneWrapper:
         Returns:
             Tupla (éxito, mensaje)
         """
-        # Verificar si es la primera sincronización
-        # bisync guarda archivos de tracking en ~/.cache/rclone/bisync/
-        bisync_cache = Path.home() / ".cache" / "rclone" / "bisync"
-        
-        # Generar nombre de tracking esperado
-        import hashlib
-        track_name = f"{path1}..{path2}".replace("/", "_").replace(":", "_")
-        tracking_exists = False
-        
-        if bisync_cache.exists():
-            # Buscar si hay archivos de tracking para esta combinación
-            for f in bisync_cache.glob("*.lst*"):
-                if track_name[:20] in f.name or any(
-                    p in f.name for p in [path1.replace(":", "_")[:15], path2.replace("/", "_")[:15]]
-                ):
-                    tracking_exists = True
-                    break
+        # Verificar si es la primera sincronización consultando el índice
+        # persistente en lugar de recorrer ~/.cache/rclone/bisync/
+        tracking_exists = self._has_bisync_tracking(path1, path2)
         
         try:
             args = ["bisync", path1, path2]
@@ -488,22 +1037,20 @@ class RcloneWrapper:
             
             # Usar resync si es primera vez o si se solicita
             if resync or force_resync or not tracking_exists:
-                args.extend(["--resync", "--ignore-listing-checksum"])
+                args += _BISYNC_RESYNC
                 logger.info(f"🔄 Forzando resincronización completa para: {path1}")
             
             # Flags de rclone para evitar bloqueos y dar más info
-            args.extend([
-                "--verbose", 
-                "--stats", "1s", 
-                "--stats-one-line",
-                "--conflict-resolve", "newer"  # El archivo más reciente siempre gana
-            ])
+            args += _BISYNC_FLAGS
             
             result = self._run_command(args, timeout=3600)
             
             # Algunos errores de bisync salen con return code 0 pero son fallos
             if "ERROR" in result.stderr and ("Bisync aborted" in result.stderr or "critical error" in result.stderr):
                 raise RcloneError(result.stderr)
+            
+            if not dry_run:
+                self._record_bisync_tracking(path1, path2)
                 
             return True, "Sincronización completada"
             
@@ -511,29 +1058,29 @@ class RcloneWrapper:
             error_str = str(e)
             
             # 1. Detectar errores de autenticación/permisos
-            auth_errors = ["expired", "token", "authorize", "401 Unauthorized", "login"]
-            if any(err in error_str.lower() for err in auth_errors):
+            if _AUTH_ERROR_RE.search(error_str):
                 return False, "Error de autenticación: Por favor, elimina y vuelve a añadir la cuenta."
 
             # 2. Detectar fallos de listings/cache
-            resync_triggers = ["resync", "prior sync", "cannot find prior", "listings", "aborted", "recovery"]
-            
-            if any(trigger in error_str.lower() for trigger in resync_triggers):
+            if _RESYNC_TRIGGER_RE.search(error_str):
                 if not resync and not force_resync:
                     logger.warning("Fallo en archivos de control de rclone. Limpiando caché...")
+                    self._forget_bisync_tracking(path1, path2)
                     
                     # LIMPIEZA PROFUNDA: Borrar listings y locks
                     try:
-                        bisync_cache = Path.home() / ".cache" / "rclone" / "bisync"
-                        if bisync_cache.exists():
-                            # Borrar archivos relacionados con estas rutas
-                            # (rclone usa hashes o rutas planas en los nombres de archivo)
-                            for f in bisync_cache.glob("*"):
+                        bisync_cache = self._bisync_cache_dir
+                        # Borrar archivos relacionados con estas rutas
+                        # (rclone usa hashes o rutas planas en los nombres de archivo)
+                        with os.scandir(bisync_cache) as entries:
+                            for entry in entries:
                                 # Si el nombre del archivo contiene partes de la ruta, lo borramos
                                 # o simplemente borramos todo lo de bisync para mayor seguridad
-                                if ".lst" in f.name or ".lck" in f.name:
-                                    f.unlink()
-                            logger.info("Caché de bisync limpiada satisfactoriamente")
+                                if ".lst" in entry.name or ".lck" in entry.name:
+                                    os.unlink(entry.path)
+                        logger.info("Caché de bisync limpiada satisfactoriamente")
+                    except FileNotFoundError:
+                        pass
                     except Exception as ce:
                         logger.error(f"No se pudo limpiar la caché: {ce}")
                     
@@ -555,46 +1102,54 @@ class RcloneWrapper:
         # PRIMERO: Limpiar cualquier lock file existente antes de iniciar
         self._cleanup_bisync_locks(path1, path2)
         
-        args = [
-            "bisync", path1, path2, 
-            "--verbose", 
-            "--stats", "1s",
-            "--conflict-resolve", "newer",
-            "--resilient",
-            "--force",
-            "--remove-empty-dirs",
-            "--fix-case",
-            "--recover",
-            "--no-cleanup"
-        ]
-        
-        # Flag para permitir descarga de archivos con 'abuse' (malware detectado por google)
-        args.append("--drive-acknowledge-abuse")
-        
+        args = ["bisync", path1, path2, *_BISYNC_FLAGS_STREAM]
         if resync:
-            args.extend(["--resync", "--ignore-listing-checksum"])
+            args += _BISYNC_RESYNC
         
         lock_file_detected = False
+        cancelled = False
+        failed = False
+        # Lock files ya tratados en esta ejecución (rclone repite el aviso)
+        attempted_locks: set = set()
         
-        for line in self._run_command_stream(args):
+        # Las líneas llegan en bytes: los registros JSON se parsean sin decodificar
+        for raw_line in self._run_command_stream(args, raw=True):
+            record, line = _parse_json_log(raw_line)
+            msg = record.get("msg", "") if record else line
+            
+            if not record and line.startswith(STREAM_CANCELLED):
+                cancelled = True
+                yield line
+                continue
+            
+            if not record and line.startswith(_STREAM_EXIT_ERROR):
+                failed = True
+            
             # Check for lock file error in the stream
-            if "prior lock file found" in line:
+            if "prior lock file found" in msg:
                 logger.warning(f"Lock file detected in stream: {line.strip()}")
                 lock_file_detected = True
                 try:
                     # Extract path from error (usually ends with .lck)
-                    if ": " in line:
-                        lock_path = line.split(": ")[-1].strip()
-                        if lock_path.endswith(".lck") and Path(lock_path).exists():
-                            logger.info(f"Removing stale lock file: {lock_path}")
-                            Path(lock_path).unlink()
+                    lock_path = record.get("object", "") if record else ""
+                    if not lock_path:
+                        lock_path = msg.rpartition(": ")[2]
+                    lock_path = lock_path.strip()
+                    if lock_path.endswith(".lck") and lock_path not in attempted_locks:
+                        attempted_locks.add(lock_path)
+                        logger.info(f"Removing stale lock file: {lock_path}")
+                        Path(lock_path).unlink(missing_ok=True)
                 except Exception as e:
                     logger.error(f"Failed to remove lock file: {e}")
             
             yield line
         
+        # Con éxito el par queda inicializado: bisync() no forzará --resync
+        if not cancelled and not failed and not lock_file_detected:
+            self._record_bisync_tracking(path1, path2)
+        
         # Si se detectó un lock file, hacer limpieza completa y señalar para reintento
-        if lock_file_detected:
+        if lock_file_detected and not cancelled:
             self._cleanup_bisync_locks(path1, path2)
             yield "RETRY_NEEDED: Lock file was cleaned"
 
@@ -606,33 +1161,41 @@ class RcloneWrapper:
             path1: Primera ruta (opcional, para limpieza específica)
             path2: Segunda ruta (opcional, para limpieza específica)
         """
+        # Normalizar las rutas una sola vez para comparar con los nombres
+        path1_norm = path1.replace("/", "_").replace(":", "_") if path1 else ""
+        path2_norm = path2.replace("/", "_").replace(":", "_") if path2 else ""
+        
         try:
-            bisync_cache = Path.home() / ".cache" / "rclone" / "bisync"
-            if not bisync_cache.exists():
-                return
+            bisync_cache = self._bisync_cache_dir
             
             cleaned = 0
-            for f in bisync_cache.glob("*"):
-                # Limpiar todos los lock files
-                if f.name.endswith(".lck"):
-                    logger.info(f"Eliminando lock file: {f.name}")
-                    f.unlink()
-                    cleaned += 1
-                # Si se especifican rutas, limpiar también listings relacionados
-                elif path1 or path2:
-                    # Normalizar las rutas para comparar
-                    path1_norm = path1.replace("/", "_").replace(":", "_") if path1 else ""
-                    path2_norm = path2.replace("/", "_").replace(":", "_") if path2 else ""
-                    
-                    if (path1_norm and path1_norm in f.name) or (path2_norm and path2_norm in f.name):
-                        if f.name.endswith(".lst") or f.name.endswith(".lck"):
-                            logger.info(f"Eliminando archivo de caché: {f.name}")
-                            f.unlink()
-                            cleaned += 1
+            listings_removed = False
+            with os.scandir(bisync_cache) as entries:
+                for entry in entries:
+                    name = entry.name
+                    # Limpiar todos los lock files
+                    if name.endswith(".lck"):
+                        logger.info(f"Eliminando lock file: {name}")
+                        os.unlink(entry.path)
+                        cleaned += 1
+                    # Si se especifican rutas, limpiar también listings relacionados
+                    elif name.endswith(".lst") and (
+                        (path1_norm and path1_norm in name) or (path2_norm and path2_norm in name)
+                    ):
+                        logger.info(f"Eliminando archivo de caché: {name}")
+                        os.unlink(entry.path)
+                        cleaned += 1
+                        listings_removed = True
+            
+            # Sin listings el par vuelve a necesitar --resync
+            if listings_removed and path1 and path2:
+                self._forget_bisync_tracking(path1, path2)
             
             if cleaned > 0:
                 logger.info(f"Limpieza completada: {cleaned} archivos eliminados")
                 
+        except FileNotFoundError:
+            return
         except Exception as e:
             logger.error(f"Error limpiando caché de bisync: {e}")
 
@@ -651,8 +1214,11 @@ class RcloneWrapper:
             Diccionario con total, used, free, trashed
         """
         try:
-            result = self._run_command(["about", f"{remote_name}:", "--json"])
-            return json.loads(result.stdout)
+            data = self._rc_call("operations/about", {"fs": f"{remote_name}:"}, timeout=60)
+            if data is not None:
+                return data
+            
+            return json_loads(self._run_command_bytes(["about", f"{remote_name}:", "--json"]))
         except (RcloneError, json.JSONDecodeError) as e:
             logger.error(f"Error obteniendo uso de disco: {e}")
             return {}
@@ -668,7 +1234,8 @@ class RcloneWrapper:
             True si la conexión es exitosa
         """
         try:
-            self._run_command(["about", f"{remote_name}:"], timeout=30)
+            if self._rc_call("operations/about", {"fs": f"{remote_name}:"}, timeout=30) is None:
+                self._run_command(["about", f"{remote_name}:"], timeout=30)
             return True
         except RcloneError:
             return False
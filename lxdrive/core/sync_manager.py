@@ -1,7 +1,13 @@
+import functools
+import os
+import queue
+import re
 import threading
 import time
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Callable, Any, Tuple, Set
+from typing import Optional, Dict, Callable, Any, Tuple, Set, NamedTuple
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from loguru import logger
@@ -15,7 +21,127 @@ except ImportError:
     logger.warning("Watchdog no instalado. La detección de cambios instantánea no funcionará. (pip install watchdog)")
 
 from .account_manager import Account, AccountManager, SyncStatus, SyncDirection
-from .rclone_wrapper import RcloneWrapper
+from .rclone_wrapper import RcloneWrapper, STREAM_CANCELLED
+
+
+# Directorio donde rclone bisync guarda listings y lock files
+_BISYNC_CACHE = Path.home() / ".cache" / "rclone" / "bisync"
+
+# Edad a partir de la cual un lock file se considera zombie (5 minutos, en ns)
+_LOCK_MAX_AGE_NS = 300 * 1_000_000_000
+
+# --- Parser de líneas de rclone bisync (compilado una sola vez) ---
+
+# Palabras que marcan una línea como error
+_ERROR_RE = re.compile(r"error|fatal|failed|critical", re.IGNORECASE)
+
+# Clasificación de líneas de error: avisos, fin por señal, lock benigno y lock activo
+_IGNORED_ERROR_RE = re.compile(r"ignoring", re.IGNORECASE)
+_SIGNAL_EXIT_RE = re.compile(r"código 1(?:43|30)|signal|terminated", re.IGNORECASE)
+_BENIGN_LOCK_RE = re.compile(r"cannot remove lockfile|no such file or directory", re.IGNORECASE)
+_LOCK_ERROR_RE = re.compile(r"lock file found|prior lock", re.IGNORECASE)
+
+# Líneas de resumen estadístico que no son actividad de archivos
+_STATS_RE = re.compile(r"changes:|delta|synchronizing", re.IGNORECASE)
+
+# Acciones sobre archivos que interesan al panel de actividad
+_FILE_ACTION_RE = re.compile(r"copied|updated|deleted|moved|skipped|removed", re.IGNORECASE)
+
+# "INFO : [PathX:] ruta/al/archivo: Acción"
+_INFO_LINE_RE = re.compile(
+    r"INFO\s*:?\s*"
+    r"(?:(?P<side>[^:]*Path[12][^:]*):\s*)?"
+    r"(?P<path>[^:]+?)\s*:\s*"
+    r"(?P<action>[^:]*)"
+)
+
+class _SafeNameTable(dict):
+    """Tabla para str.translate: sustituye por '_' todo carácter no alfanumérico."""
+
+    def __missing__(self, codepoint: int) -> str:
+        char = chr(codepoint)
+        value = char if char.isalnum() else "_"
+        self[codepoint] = value
+        return value
+
+
+_SAFE_TABLE = _SafeNameTable()
+
+# Refinado de acción sobre la línea completa, sin construir una copia en minúsculas
+_DELETE_WORD_RE = re.compile(r"deleted|removing|removed|unlink", re.IGNORECASE)
+_MOVE_WORD_RE = re.compile(r"moved|renamed|renaming", re.IGNORECASE)
+
+# Palabras clave de rclone que no son nombres de archivo
+_ACTION_WORDS = frozenset(["deleted", "copied", "updated", "moved", "skipped", "changes", "renamed"])
+
+
+class _FileEvent(NamedTuple):
+    """Evento de archivo de bisync pendiente de emparejar como renombre (tupla, sin dict por línea)"""
+    name: str
+    path: str
+    action: str
+    time: float
+    ext: str
+    parent: str
+
+
+def _split_event_path(path: str) -> Tuple[str, str, str]:
+    """(carpeta, nombre, extensión) de una ruta de evento, sin construir Path"""
+    parent, name = os.path.split(path)
+    return parent, name, os.path.splitext(name)[1]
+
+
+class _DebounceScheduler(threading.Thread):
+    """
+    Hilo único que ejecuta callbacks tras un periodo sin eventos (debounce).
+    
+    Cada schedule() con la misma clave reprograma la ejecución, así el
+    callback se dispara cuando dejan de llegar eventos, sin crear un
+    threading.Timer por evento.
+    """
+    
+    def __init__(self):
+        super().__init__(name="lxdrive-debounce", daemon=True)
+        self._cond = threading.Condition()
+        self._pending: Dict[Any, Tuple[float, Callable]] = {}  # {clave: (instante, callback)}
+    
+    def schedule(self, key: Any, delay: float, callback: Callable):
+        """Programa (o reprograma) el callback de una clave"""
+        with self._cond:
+            self._pending[key] = (time.monotonic() + delay, callback)
+            self._cond.notify()
+    
+    def run(self):
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    due = [key for key, (fire_at, _) in self._pending.items() if fire_at <= now]
+                    if due:
+                        break
+                    next_fire = min((fire_at for fire_at, _ in self._pending.values()), default=None)
+                    self._cond.wait(None if next_fire is None else next_fire - now)
+                callbacks = [self._pending.pop(key)[1] for key in due]
+            
+            for callback in callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    logger.error(f"Error en callback diferido: {e}")
+
+
+_debounce_scheduler: Optional[_DebounceScheduler] = None
+_debounce_scheduler_lock = threading.Lock()
+
+
+def _get_debounce_scheduler() -> _DebounceScheduler:
+    """Devuelve el planificador compartido, iniciándolo en el primer uso"""
+    global _debounce_scheduler
+    with _debounce_scheduler_lock:
+        if _debounce_scheduler is None:
+            _debounce_scheduler = _DebounceScheduler()
+            _debounce_scheduler.start()
+        return _debounce_scheduler
 
 
 class ChangeHandler(FileSystemEventHandler):
@@ -33,36 +159,78 @@ class ChangeHandler(FileSystemEventHandler):
     
     # Patrones de archivos temporales a ignorar (generados por rclone durante sync)
     IGNORE_PATTERNS = ['.partial', '.tmp', '.rclone', '~', '.swp', '.swo']
+    # Una sola búsqueda en C en lugar de lower() + un 'in' por patrón
+    _IGNORE_RE = re.compile("|".join(map(re.escape, IGNORE_PATTERNS)), re.IGNORECASE)
     
-    def __init__(self, callback, debounce=2.0, base_path: str = ""):
+    def __init__(self, callback, debounce=2.0, base_path: str = "", key: Any = None):
         self.callback = callback
         self.debounce = debounce
         self.base_path = base_path  # Ruta base que estamos monitoreando
-        self._timer: Optional[threading.Timer] = None
+        # Clave de agrupación del debounce (handlers con la misma clave comparten callback)
+        self.key = key if key is not None else base_path
+        self._scheduler = _get_debounce_scheduler()
         self._lock = threading.Lock()
         
-        # Flag para pausar detección durante sincronización
+        # Flag para pausar detección durante sincronización. Solo lo escribe
+        # set_sync_in_progress; los eventos lo leen sin lock (lectura atómica).
+        # Varias cuentas pueden sincronizar la misma carpeta a la vez: sigue
+        # pausado mientras quede alguna (_sync_depth > 0)
         self._sync_in_progress = False
+        self._sync_depth = 0
         
         # Tracking para detectar renombres como Delete+Create
-        self._pending_deletes: Dict[str, dict] = {}  # {path: {size, mtime, time}}
+        # Agrupados por (carpeta, extensión), la misma clave con la que se empareja un
+        # create: cada evento consulta solo su grupo en lugar de recorrer todos los deletes
+        self._pending_deletes: Dict[Tuple[str, str], Dict[str, float]] = {}  # {(parent, ext): {path: time}}
         self._rename_window = 2.0  # Segundos para considerar delete+create como rename
         
         # Cola de renombres detectados para procesar antes del bisync
         self._pending_renames: list = []  # [(old_path, new_path), ...]
 
         # Tracking de directorios movidos para evitar duplicación de eventos hijos
-        self._moved_directories: Dict[str, dict] = {}  # {old_path: {new_path, time}}
+        # Origen y destino se guardan como claves propias: la consulta recorre los
+        # ancestros del path con búsquedas en diccionario, O(profundidad)
+        self._moved_directories: Dict[str, float] = {}  # {dir_path: time}
         self._directory_move_window = 5.0  # Segundos para ignorar cambios dentro de directorios movidos
+        
+        # Métodos por tipo de evento; el resto (opened, closed...) se descarta en dispatch
+        self._event_methods: Dict[str, Callable] = {
+            "moved": self.on_moved,
+            "created": self.on_created,
+            "deleted": self.on_deleted,
+            "modified": self.on_modified,
+        }
     
     def set_sync_in_progress(self, in_progress: bool):
-        """Marca si hay una sincronización en progreso para ignorar cambios de rclone"""
+        """
+        Marca el inicio (True) o el fin (False) de una sincronización para
+        ignorar los cambios de rclone. Cada inicio debe emparejarse con un fin.
+        """
         with self._lock:
-            self._sync_in_progress = in_progress
-            if in_progress:
-                logger.debug(f"Watchdog pausado para {self.base_path}")
-            else:
-                logger.debug(f"Watchdog reanudado para {self.base_path}")
+            self._sync_depth = max(0, self._sync_depth + (1 if in_progress else -1))
+            was_paused = self._sync_in_progress
+            self._sync_in_progress = self._sync_depth > 0
+            changed = was_paused != self._sync_in_progress
+        
+        if changed and in_progress:
+            logger.debug(f"Watchdog pausado para {self.base_path}")
+        elif changed:
+            logger.debug(f"Watchdog reanudado para {self.base_path}")
+    
+    def dispatch(self, event):
+        """
+        Despacha un evento de watchdog filtrándolo antes de cualquier otro trabajo.
+        
+        Durante una sincronización solo se procesan los movimientos de directorios
+        (el resto lo ignoraría _should_ignore igualmente), y los tipos de evento sin
+        manejador no llegan a on_any_event ni a la búsqueda dinámica del método.
+        """
+        method = self._event_methods.get(event.event_type)
+        if method is None:
+            return
+        if self._sync_in_progress and not (event.is_directory and event.event_type == "moved"):
+            return
+        method(event)
     
     def _should_ignore(self, path: str) -> bool:
         """Determina si un archivo debe ignorarse (temporal de rclone, etc.)"""
@@ -71,11 +239,9 @@ class ChangeHandler(FileSystemEventHandler):
             return True
         
         # Ignorar archivos temporales
-        path_lower = path.lower()
-        for pattern in self.IGNORE_PATTERNS:
-            if pattern in path_lower:
-                logger.debug(f"Ignorando archivo temporal: {path}")
-                return True
+        if self._IGNORE_RE.search(path):
+            logger.debug(f"Ignorando archivo temporal: {path}")
+            return True
         
         # Ignorar si el archivo está dentro de un directorio que se acaba de mover
         # (Para evitar ráfagas de eventos Delete/Create que confunden a bisync)
@@ -87,49 +253,37 @@ class ChangeHandler(FileSystemEventHandler):
         
     def _is_within_moved_directory(self, path: str) -> bool:
         """Verifica si una ruta está dentro de un directorio movido recientemente."""
+        # Caso habitual sin movimientos recientes: salir sin tomar el lock
+        if not self._moved_directories:
+            return False
         with self._lock:
-            path_obj = Path(path)
-            now = time.time()
+            now = time.monotonic()
             
-            # Buscar si este path está dentro de algún directorio movido
-            for old_dir_path, move_info in list(self._moved_directories.items()):
-                # Limpiar si ya expiró la ventana de tiempo
-                if now - move_info["time"] > self._directory_move_window:
-                    del self._moved_directories[old_dir_path]
-                    continue
-                
-                # Verificar si el path es descendiente del directorio movido (origen o destino)
-                try:
-                    # Si el archivo pertenecía al path viejo
-                    path_obj.relative_to(Path(old_dir_path))
-                    return True
-                except ValueError:
-                    pass
-                
-                try:
-                    # Si el archivo pertenece al path nuevo
-                    path_obj.relative_to(Path(move_info["new_path"]))
-                    return True
-                except ValueError:
-                    pass
-            
-            return False
+            # Subir por los ancestros del path buscando un directorio movido (origen o destino)
+            candidate = path
+            while True:
+                moved_at = self._moved_directories.get(candidate)
+                if moved_at is not None:
+                    if now - moved_at <= self._directory_move_window:
+                        return True
+                    # Limpiar si ya expiró la ventana de tiempo
+                    del self._moved_directories[candidate]
+                parent = os.path.dirname(candidate)
+                if parent == candidate:
+                    return False
+                candidate = parent
 
     def get_and_clear_renames(self) -> list:
         """Obtiene y limpia la lista de renombres pendientes"""
         with self._lock:
-            renames = self._pending_renames.copy()
-            self._pending_renames.clear()
+            # Intercambiar la lista en lugar de copiarla: O(1) dentro del lock
+            renames, self._pending_renames = self._pending_renames, []
             self._moved_directories.clear() # Limpiar tracking de directorios al procesar
-            return renames
+        return renames
         
     def _schedule_callback(self):
-        """Programa el callback con debounce"""
-        with self._lock:
-            if self._timer:
-                self._timer.cancel()
-            self._timer = threading.Timer(self.debounce, self.callback)
-            self._timer.start()
+        """Programa el callback con debounce (se reinicia con cada evento)"""
+        self._scheduler.schedule(("sync", self.key), self.debounce, self.callback)
     
     def on_moved(self, event):
         """Maneja eventos de movimiento/renombre (FileMovedEvent)"""
@@ -137,10 +291,13 @@ class ChangeHandler(FileSystemEventHandler):
             # Soporte para renombres de directorios (evita duplicación de archivos dentro)
             logger.info(f"Directorio movido detectado: {event.src_path} -> {event.dest_path}")
             with self._lock:
-                self._moved_directories[event.src_path] = {
-                    "new_path": event.dest_path,
-                    "time": time.time()
-                }
+                now = time.monotonic()
+                expired = [p for p, t in self._moved_directories.items()
+                           if now - t > self._directory_move_window]
+                for p in expired:
+                    del self._moved_directories[p]
+                self._moved_directories[event.src_path] = now
+                self._moved_directories[event.dest_path] = now
                 self._pending_renames.append((event.src_path, event.dest_path))
             self._schedule_callback()
             return
@@ -150,7 +307,7 @@ class ChangeHandler(FileSystemEventHandler):
             return
         
         # Ignorar si el origen es un archivo .partial (rclone finalizando descarga)
-        if '.partial' in event.src_path:
+        if event.src_path.endswith('.partial'):
             logger.debug(f"Ignorando finalización de descarga rclone: {event.src_path}")
             return
         
@@ -175,19 +332,16 @@ class ChangeHandler(FileSystemEventHandler):
         logger.debug(f"Archivo eliminado detectado: {event.src_path}")
         
         # Guardar información del archivo eliminado para posible emparejamiento
+        parent, _, ext = _split_event_path(event.src_path)
         with self._lock:
-            self._pending_deletes[event.src_path] = {
-                "time": time.time(),
-                "ext": Path(event.src_path).suffix,
-                "parent": str(Path(event.src_path).parent),
-                "name": Path(event.src_path).name,
-                "full_path": event.src_path
-            }
+            self._pending_deletes.setdefault((parent, ext), {})[event.src_path] = time.monotonic()
         
         self._schedule_callback()
         
         # Limpiar deletes antiguos después de la ventana de tiempo
-        threading.Timer(self._rename_window + 0.5, self._cleanup_pending_deletes).start()
+        self._scheduler.schedule(
+            ("cleanup", id(self)), self._rename_window + 0.5, self._cleanup_pending_deletes
+        )
     
     def on_created(self, event):
         """Maneja eventos de creación - verifica si es parte de un rename (delete+create)"""
@@ -200,34 +354,30 @@ class ChangeHandler(FileSystemEventHandler):
         logger.debug(f"Archivo creado detectado: {event.src_path}")
         
         # Verificar si este "create" coincide con un "delete" reciente (posible rename)
-        created_path = Path(event.src_path)
-        now = time.time()
+        created_parent, created_name, created_ext = _split_event_path(event.src_path)
+        now = time.monotonic()
         
         with self._lock:
-            matched_delete = None
-            old_path = None
-            for del_path, del_info in list(self._pending_deletes.items()):
-                # Verificar ventana de tiempo
-                if now - del_info["time"] > self._rename_window:
-                    continue
-                
-                # Verificar mismo directorio padre y misma extensión
-                if del_info["parent"] == str(created_path.parent) and \
-                   del_info["ext"] == created_path.suffix:
+            # Solo deletes del mismo directorio padre y con la misma extensión
+            group_key = (created_parent, created_ext)
+            group = self._pending_deletes.get(group_key)
+            if group:
+                for del_path, deleted_at in group.items():
+                    # Verificar ventana de tiempo y que no sea el mismo archivo
+                    if now - deleted_at > self._rename_window or del_path == event.src_path:
+                        continue
                     
-                    # Verificar que no sea el mismo archivo (redundante)
-                    if del_path != event.src_path:
-                        matched_delete = del_path
-                        old_path = del_info["full_path"]
-                        logger.info(f"Renombre detectado (delete+create): {del_info['name']} -> {created_path.name}")
-                        
-                        # Guardar el renombre detectado
-                        self._pending_renames.append((old_path, event.src_path))
-                        break
-            
-            # Consumir el delete emparejado
-            if matched_delete:
-                del self._pending_deletes[matched_delete]
+                    logger.info(
+                        f"Renombre detectado (delete+create): {os.path.basename(del_path)} -> {created_name}"
+                    )
+                    # Guardar el renombre detectado
+                    self._pending_renames.append((del_path, event.src_path))
+                    
+                    # Consumir el delete emparejado
+                    del group[del_path]
+                    if not group:
+                        del self._pending_deletes[group_key]
+                    break
         
         self._schedule_callback()
     
@@ -244,15 +394,18 @@ class ChangeHandler(FileSystemEventHandler):
     
     def _cleanup_pending_deletes(self):
         """Limpia deletes antiguos que no se emparejaron"""
-        now = time.time()
+        now = time.monotonic()
         with self._lock:
-            expired = [p for p, info in self._pending_deletes.items() 
-                      if now - info["time"] > self._rename_window]
-            for p in expired:
-                del self._pending_deletes[p]
+            for group_key in list(self._pending_deletes):
+                group = self._pending_deletes[group_key]
+                expired = [p for p, deleted_at in group.items() if now - deleted_at > self._rename_window]
+                for p in expired:
+                    del group[p]
+                if not group:
+                    del self._pending_deletes[group_key]
 
 
-@dataclass
+@dataclass(slots=True)
 class SyncTask:
     """Representa una tarea de sincronización"""
     account_id: str
@@ -278,6 +431,20 @@ class SyncManager:
     - Manejo de errores y reintentos
     """
     
+    # Máximo de sincronizaciones simultáneas (hilos del pool compartido)
+    MAX_CONCURRENT_SYNCS = 4
+    # Espera máxima del bucle periódico sin nada programado y espera mínima
+    # entre pasadas
+    MAX_LOOP_WAIT = 60.0
+    MIN_LOOP_WAIT = 1.0
+    # Espera antes de reintentar una cuenta cuya sincronización lanzó una excepción
+    FAILURE_BACKOFF = 30.0
+    # Lotes de actividad: máximo de eventos y ventana de agrupación (segundos)
+    ACTIVITY_BATCH_SIZE = 32
+    ACTIVITY_BATCH_WINDOW = 0.016
+    # Renombres server-side (rclone moveto) lanzados a la vez cuando son independientes
+    MAX_CONCURRENT_RENAMES = 8
+    
     def __init__(
         self, 
         rclone: RcloneWrapper, 
@@ -295,9 +462,28 @@ class SyncManager:
         
         # Estado interno
         self._running = False
-        self._thread: Optional[threading.Thread] = None
-        self._lock = threading.RLock()
-        self._active_syncs: set = set()  # Conjunto de IDs activos para concurrencia
+        self._sync_thread: Optional[threading.Thread] = None
+        # Despierta el bucle periódico (stop, sync terminada, cuenta reanudada
+        # o cuentas añadidas/editadas/eliminadas)
+        self._wakeup = threading.Event()
+        self.account_manager.add_change_listener(self._wakeup.set)
+        # stop() pedido: las syncs en curso no deben reintentar ni hacer resync.
+        # No basta con _running: sin sync_on_startup las syncs manuales corren
+        # con el servicio parado
+        self._stop_requested = threading.Event()
+        self._lock = threading.Lock()  # Secciones críticas cortas, sin reentrada
+        
+        # Pool de hilos compartido para las sincronizaciones (en lugar de un
+        # hilo nuevo por cada sync) y tarea en curso/encolada por ID
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._futures: Dict[str, Future] = {}
+        
+        # Último escaneo de lock files: (mtime_ns del directorio, instante en
+        # que el lock más reciente pasa a considerarse zombie, en ns de reloj de pared)
+        self._lck_scan_cache: Tuple[int, float] = (0, 0)
+        # IDs activos para concurrencia. Inmutable: se reemplaza bajo _lock y
+        # los lectores lo consultan sin bloquear
+        self._active_syncs: frozenset = frozenset()
         self._pending_syncs: set = set() # Cola de IDs que necesitan sync al terminar la actual
         
         # Historial de listados para detectar renombres manualmente si rclone falla
@@ -310,14 +496,29 @@ class SyncManager:
         self._on_sync_error: Optional[Callable[[str, str], None]] = None
         self._on_progress: Optional[Callable[[str, float], None]] = None
         self._on_file_activity: Optional[Callable[[str, str, str, str], None]] = None  # (acc_id, name, action, path)
+        self._on_file_activity_batch: Optional[Callable[[list], None]] = None  # [(acc_id, name, action, path), ...]
         
+        # Cola de actividad: el lector de rclone solo encola, un hilo aparte entrega
+        self._activity_queue: "queue.SimpleQueue[tuple]" = queue.SimpleQueue()
+        self._activity_thread: Optional[threading.Thread] = None
         
-        # Callbacks
-        self._last_sync_times: Dict[str, datetime] = {}
+        
+        # Instante (time.monotonic) de la última sincronización de cada cuenta
+        self._last_sync_times: Dict[str, float] = {}
+        # Instante (time.monotonic) a partir del cual reintentar una cuenta que falló
+        self._retry_at: Dict[str, float] = {}
         
         # Watchdog
         self._observer = Observer() if WATCHDOG_AVAILABLE else None
         self._watchers: Dict[str, Any] = {} # Map de path -> watcher
+        # Un solo watch por carpeta aunque varias cuentas la sincronicen
+        self._path_to_accounts: Dict[str, Set[str]] = {}
+        # (mutation_epoch, cuentas habilitadas): evita refiltrar en cada tick
+        self._accounts_cache: Tuple[int, list] = (-1, [])
+        # Nombre saneado de cada carpeta local tal como aparece en los archivos de bisync
+        self._safe_local_cache: Dict[str, str] = {}
+        # Ruta resuelta (realpath) de cada carpeta local; se recalcula al reiniciar el servicio
+        self._resolved_paths: Dict[str, str] = {}
 
     def set_callbacks(
         self,
@@ -325,7 +526,8 @@ class SyncManager:
         on_complete=None,
         on_error=None,
         on_progress=None,
-        on_activity=None
+        on_activity=None,
+        on_activity_batch=None
     ):
         """Configura los callbacks para eventos de sincronización"""
         self._on_sync_start = on_start
@@ -333,6 +535,51 @@ class SyncManager:
         self._on_sync_error = on_error
         self._on_progress = on_progress
         self._on_file_activity = on_activity
+        self._on_file_activity_batch = on_activity_batch
+    
+    def _emit_activity(self, account_id: str, name: str, action: str, path: str) -> bool:
+        """
+        Encola un evento de actividad sin bloquear al lector de rclone.
+        
+        Returns:
+            True si hay algún callback de actividad configurado
+        """
+        if not (self._on_file_activity or self._on_file_activity_batch):
+            return False
+        
+        if self._activity_thread is None:
+            with self._lock:
+                if self._activity_thread is None:
+                    self._activity_thread = threading.Thread(
+                        target=self._activity_drainer, name="sync-activity", daemon=True
+                    )
+                    self._activity_thread.start()
+        
+        self._activity_queue.put_nowait((account_id, name, action, path))
+        return True
+    
+    def _activity_drainer(self):
+        """Entrega la actividad encolada en lotes a los callbacks"""
+        while True:
+            batch = [self._activity_queue.get()]
+            deadline = time.monotonic() + self.ACTIVITY_BATCH_WINDOW
+            while len(batch) < self.ACTIVITY_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._activity_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            try:
+                if self._on_file_activity_batch:
+                    self._on_file_activity_batch(batch)
+                elif self._on_file_activity:
+                    for item in batch:
+                        self._on_file_activity(*item)
+            except Exception as e:
+                logger.error(f"Error entregando actividad de sincronización: {e}")
     
     def start(self):
         """Inicia el servicio de sincronización en segundo plano"""
@@ -341,6 +588,9 @@ class SyncManager:
             return
         
         self._running = True
+        self._wakeup.clear()
+        self._stop_requested.clear()
+        self._resolved_paths.clear()
         self._sync_thread = threading.Thread(target=self._sync_loop, daemon=True)
         self._sync_thread.start()
         
@@ -349,7 +599,7 @@ class SyncManager:
             try:
                 self._observer.start()
                 # Registrar carpetas
-                for account in self.account_manager.get_enabled_accounts():
+                for account in self._enabled_accounts():
                     self._start_watching(account)
                 logger.info("Monitor de cambios en tiempo real (Watchdog) iniciado")
             except Exception as e:
@@ -360,14 +610,24 @@ class SyncManager:
     def stop(self):
         """Detiene el servicio de sincronización"""
         self._running = False
+        self._wakeup.set()
+        self._stop_requested.set()
+        self.rclone.stop_streams()
         if self._sync_thread:
             self._sync_thread.join(timeout=5)
+        
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._futures.clear()
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
             
         if self._observer:
             try:
                 self._observer.stop()
                 self._observer.join()
-            except: pass
+            except Exception as e:
+                logger.debug(f"Error deteniendo Watchdog: {e}")
             
         logger.info("Servicio de sincronización detenido")
     
@@ -377,14 +637,20 @@ class SyncManager:
         
         for pair in account.sync_pairs:
             if not pair.enabled: continue
-            path = str(Path(pair.local_path).resolve())
+            path = self._resolve_local(pair.local_path)
             
+            # Registrar la cuenta antes de comprobar si la carpeta ya está vigilada
+            self._path_to_accounts.setdefault(path, set()).add(account.id)
             if path in self._watchers: continue
             
             try:
                 # Pasamos la cuenta y la ruta base al handler para poder procesar renombres
                 handler = ChangeHandler(
-                    callback=lambda acc_id=account.id: self.sync_now(acc_id),
+                    callback=functools.partial(self._dispatch_path_change, path),
+                    # La clave del debounce es la carpeta (por defecto base_path), igual que
+                    # el callback: con la cuenta como clave, una carpeta de la misma cuenta
+                    # reemplazaría el callback de otra compartida con más cuentas. Las
+                    # syncs repetidas de una cuenta ya las descarta _submit
                     base_path=path
                 )
                 self._observer.schedule(handler, path, recursive=True)
@@ -398,35 +664,84 @@ class SyncManager:
             except Exception as e:
                 logger.warning(f"No se pudo vigilar {path}: {e}")
 
+    def _dispatch_path_change(self, path: str):
+        """Lanza la sincronización de todas las cuentas que comparten la carpeta vigilada"""
+        # Un debounce pendiente puede dispararse tras stop(): no reanudar syncs
+        if not self._running:
+            return
+        for account_id in tuple(self._path_to_accounts.get(path, ())):
+            self.sync_now(account_id)
+
     def is_running(self) -> bool:
         """Verifica si el servicio está corriendo"""
         return self._running
     
     def is_sync_active(self, sync_id: str) -> bool:
         """Verifica si una sincronización específica está activa"""
-        with self._lock:
-            return sync_id in self._active_syncs
+        return sync_id in self._active_syncs
 
     def get_active_syncs(self) -> list:
         """Obtiene lista de IDs activos"""
-        with self._lock:
-            return list(self._active_syncs)
+        return list(self._active_syncs)
     
+    def _submit(self, key: str, fn: Callable, *args) -> bool:
+        """
+        Encola una sincronización en el pool compartido.
+        
+        Args:
+            key: ID de la sincronización (cuenta o cuenta:par)
+            fn: Función a ejecutar
+            
+        Returns:
+            False si ya hay una sincronización en curso o encolada con ese ID
+        """
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None and not future.done():
+                return False
+            
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.MAX_CONCURRENT_SYNCS,
+                    thread_name_prefix="lxdrive-sync"
+                )
+            self._futures[key] = self._executor.submit(fn, *args)
+            return True
+
     def _sync_loop(self):
         """Bucle principal de sincronización"""
         while self._running:
+            next_due = None
             try:
-                self._check_and_sync()
+                next_due = self._check_and_sync()
             except Exception as e:
                 logger.error(f"Error en bucle de sincronización: {e}")
             
-            # Esperar antes de la siguiente verificación
-            time.sleep(5)  # Verificar cada 5 segundos
+            # Dormir hasta que toque la próxima cuenta; stop(), el fin de una
+            # sincronización, una reanudación o un cambio de cuentas interrumpen
+            # la espera
+            timeout = self.MAX_LOOP_WAIT if next_due is None else min(next_due, self.MAX_LOOP_WAIT)
+            self._wakeup.wait(max(self.MIN_LOOP_WAIT, timeout))
+            self._wakeup.clear()
     
-    def _check_and_sync(self):
-        """Verifica qué cuentas necesitan sincronización"""
-        accounts = self.account_manager.get_enabled_accounts()
-        now = datetime.now()
+    def _enabled_accounts(self) -> list:
+        """Cuentas habilitadas, recalculadas solo si el AccountManager cambió"""
+        epoch = self.account_manager.mutation_epoch
+        if epoch != self._accounts_cache[0]:
+            self._accounts_cache = (epoch, self.account_manager.get_enabled_accounts())
+        return self._accounts_cache[1]
+
+    def _check_and_sync(self) -> Optional[float]:
+        """
+        Verifica qué cuentas necesitan sincronización.
+        
+        Returns:
+            Segundos hasta la próxima cuenta pendiente, o None si no hay ninguna
+            (las que están sincronizando avisan al terminar)
+        """
+        accounts = self._enabled_accounts()
+        now = time.monotonic()
+        next_due = None
         
         for account in accounts:
             if account.status == SyncStatus.PAUSED:
@@ -434,14 +749,24 @@ class SyncManager:
             
             # Verificar si es momento de sincronizar
             last_sync = self._last_sync_times.get(account.id)
+            retry_at = self._retry_at.get(account.id)
             
-            if last_sync is None:
+            if retry_at is not None:
+                # La última sincronización lanzó una excepción
+                remaining = retry_at - now
+            elif last_sync is None:
                 # Primera sincronización
-                self._sync_account(account)
+                self._submit(account.id, self._sync_account, account)
+                continue
             else:
-                elapsed = (now - last_sync).total_seconds()
-                if elapsed >= account.sync_interval:
-                    self._sync_account(account)
+                remaining = account.sync_interval - (now - last_sync)
+            
+            if remaining <= 0:
+                self._submit(account.id, self._sync_account, account)
+            elif next_due is None or remaining < next_due:
+                next_due = remaining
+        
+        return next_due
     
     def _process_pending_renames(self, local_path: str, remote_name: str, remote_base_path: str):
         """
@@ -454,7 +779,7 @@ class SyncManager:
             remote_base_path: Ruta base en el remote (ej: "My Drive/Sync")
         """
         # Buscar el handler asociado a esta ruta local
-        local_path_resolved = str(Path(local_path).resolve())
+        local_path_resolved = self._resolve_local(local_path)
         watcher_info = self._watchers.get(local_path_resolved)
         
         if not watcher_info or not isinstance(watcher_info, dict):
@@ -472,50 +797,87 @@ class SyncManager:
         
         logger.info(f"Procesando {len(pending_renames)} renombre(s) detectado(s) para {local_path}")
         
+        # Invariantes del par: prefijo local y prefijo remoto (ya sin dobles barras)
+        local_prefix = local_path_resolved.rstrip(os.sep) + os.sep
+        remote_prefix = (
+            f"{remote_name}:{remote_base_path}/".replace("//", "/") if remote_base_path else f"{remote_name}:"
+        )
+        
+        renames = []  # [(old_remote, new_remote, old_relative, new_relative), ...]
         for old_local_path, new_local_path in pending_renames:
+            # Obtener ruta relativa al directorio base
+            if not (old_local_path.startswith(local_prefix) and new_local_path.startswith(local_prefix)):
+                logger.warning(f"Rutas fuera del directorio vigilado: {old_local_path} -> {new_local_path}")
+                continue
+            old_relative = old_local_path[len(local_prefix):]
+            new_relative = new_local_path[len(local_prefix):]
+            
+            renames.append((remote_prefix + old_relative, remote_prefix + new_relative, old_relative, new_relative))
+        
+        if not renames:
+            return
+        
+        def do_rename(rename):
+            old_remote, new_remote = rename[:2]
+            logger.info(f"Renombrando en servidor: {old_remote} -> {new_remote}")
             try:
-                # Calcular rutas relativas
-                old_path = Path(old_local_path)
-                new_path = Path(new_local_path)
-                base_path = Path(local_path_resolved)
-                
-                # Obtener ruta relativa al directorio base
-                try:
-                    old_relative = old_path.relative_to(base_path)
-                    new_relative = new_path.relative_to(base_path)
-                except ValueError:
-                    logger.warning(f"Rutas fuera del directorio vigilado: {old_local_path} -> {new_local_path}")
-                    continue
-                
-                # Construir rutas remotas
-                old_remote = f"{remote_name}:{remote_base_path}/{old_relative}" if remote_base_path else f"{remote_name}:{old_relative}"
-                new_remote = f"{remote_name}:{remote_base_path}/{new_relative}" if remote_base_path else f"{remote_name}:{new_relative}"
-                
-                # Limpiar posibles dobles barras
-                old_remote = old_remote.replace("//", "/")
-                new_remote = new_remote.replace("//", "/")
-                
-                logger.info(f"Renombrando en servidor: {old_remote} -> {new_remote}")
-                
-                # Ejecutar rename server-side
-                success, msg = self.rclone.moveto(old_remote, new_remote)
-                
-                if success:
-                    logger.info(f"Renombre server-side exitoso: {old_path.name} -> {new_path.name}")
-                    # Emitir evento de actividad
-                    if self._on_file_activity:
-                        self._on_file_activity(
-                            watcher_info.get("account_id", ""),
-                            new_path.name,
-                            "moved",
-                            str(new_relative)
-                        )
-                else:
-                    # Si falla (ej: archivo no existe en servidor), dejamos que bisync lo maneje
-                    logger.warning(f"Renombre server-side falló (bisync lo manejará): {msg}")
-                    
+                return self.rclone.moveto(old_remote, new_remote)
             except Exception as e:
-                logger.error(f"Error procesando renombre {old_local_path} -> {new_local_path}: {e}")
+                return False, str(e)
+        
+        # Cada moveto es un proceso y una ida y vuelta a la API: si los renombres no
+        # comparten rutas (ni encadenados a->b->c ni anidados) se solapan en paralelo
+        if len(renames) > 1 and self._renames_independent(renames):
+            with ThreadPoolExecutor(
+                max_workers=min(self.MAX_CONCURRENT_RENAMES, len(renames)),
+                thread_name_prefix="lxdrive-rename"
+            ) as pool:
+                results = list(pool.map(do_rename, renames))
+        else:
+            results = [do_rename(rename) for rename in renames]
+        
+        account_id = watcher_info.get("account_id", "")
+        for (_, _, old_relative, new_relative), (success, msg) in zip(renames, results):
+            if success:
+                new_name = new_relative.rpartition("/")[2]
+                logger.info(f"Renombre server-side exitoso: {old_relative.rpartition('/')[2]} -> {new_name}")
+                # Emitir evento de actividad
+                self._emit_activity(account_id, new_name, "moved", new_relative)
+            else:
+                # Si falla (ej: archivo no existe en servidor), dejamos que bisync lo maneje
+                logger.warning(f"Renombre server-side falló (bisync lo manejará): {msg}")
+
+    @staticmethod
+    def _renames_independent(renames: list) -> bool:
+        """True si ningún renombre toca una ruta (o un ancestro) de otro"""
+        paths = set()
+        for old_remote, new_remote, _, _ in renames:
+            paths.add(old_remote)
+            paths.add(new_remote)
+        if len(paths) != 2 * len(renames):
+            return False
+        
+        for path in paths:
+            parent = path.rpartition("/")[0]
+            while parent:
+                if parent in paths:
+                    return False
+                parent = parent.rpartition("/")[0]
+        return True
+
+    def _resolve_local(self, local_path: str) -> str:
+        """Ruta local resuelta, con una sola llamada a resolve() por carpeta"""
+        resolved = self._resolved_paths.get(local_path)
+        if resolved is None:
+            resolved = self._resolved_paths[local_path] = str(Path(local_path).resolve())
+        return resolved
+
+    def _safe_local_name(self, local_path: str) -> str:
+        """Nombre saneado (no alfanuméricos -> '_') de la carpeta local, calculado una vez"""
+        safe_local = self._safe_local_cache.get(local_path)
+        if safe_local is None:
+            safe_local = self._safe_local_cache[local_path] = local_path.translate(_SAFE_TABLE)
+        return safe_local
 
     def _sync_account(self, account: Account):
         """
@@ -527,7 +889,7 @@ class SyncManager:
         with self._lock:
             if account.id in self._active_syncs:
                 return  # Ya está sincronizando esta cuenta
-            self._active_syncs.add(account.id)
+            self._active_syncs = self._active_syncs | {account.id}
         
         task = SyncTask(
             account_id=account.id,
@@ -562,7 +924,8 @@ class SyncManager:
             task.completed_at = datetime.now()
             task.message = "\n".join(error_messages) if error_messages else "Sincronización completada"
             
-            self._last_sync_times[account.id] = datetime.now()
+            self._last_sync_times[account.id] = time.monotonic()
+            self._retry_at.pop(account.id, None)
             self.account_manager.set_status(account.id, SyncStatus.IDLE if all_success else SyncStatus.ERROR)
 
             if not all_success and self._on_sync_error:
@@ -575,6 +938,8 @@ class SyncManager:
             error_msg = str(e)
             logger.error(f"Excepción en sincronización: {error_msg}")
             self.account_manager.set_status(account.id, SyncStatus.ERROR, error_msg)
+            # Sin esto el wakeup del finally la reenviaría de inmediato en bucle
+            self._retry_at[account.id] = time.monotonic() + self.FAILURE_BACKOFF
             
             task.success = False
             task.message = error_msg
@@ -584,7 +949,9 @@ class SyncManager:
                 
         finally:
             with self._lock:
-                self._active_syncs.discard(account.id)
+                self._active_syncs = self._active_syncs - {account.id}
+            # Replanificar el bucle con el nuevo instante de última sincronización
+            self._wakeup.set()
     
     def sync_now(self, account_id: str) -> bool:
         """Sincroniza toda la cuenta (todos sus pares) inmediatamente"""
@@ -592,9 +959,8 @@ class SyncManager:
         
         account = self.account_manager.get_by_id(account_id)
         if not account: return False
-        thread = threading.Thread(target=self._sync_account, args=(account,))
-        thread.start()
-        return True
+        self._stop_requested.clear()  # Petición explícita del usuario
+        return self._submit(account_id, self._sync_account, account)
 
     def sync_pair_now(self, account_id: str, pair_id: str) -> bool:
         """Sincroniza un par específico inmediatamente"""
@@ -609,9 +975,8 @@ class SyncManager:
         pair = next((p for p in account.sync_pairs if p.id == pair_id), None)
         if not pair: return False
 
-        thread = threading.Thread(target=self._sync_single_pair_thread, args=(account, pair, lock_id))
-        thread.start()
-        return True
+        self._stop_requested.clear()  # Petición explícita del usuario
+        return self._submit(lock_id, self._sync_single_pair_thread, account, pair, lock_id)
 
     def _sync_single_pair_thread(self, account, pair, lock_id=None):
         """Hilo para sincronizar un solo par"""
@@ -620,7 +985,7 @@ class SyncManager:
 
         with self._lock:
             if lock_id in self._active_syncs: return
-            self._active_syncs.add(lock_id)
+            self._active_syncs = self._active_syncs | {lock_id}
 
         try:
             if self._on_sync_start: self._on_sync_start(account.id)
@@ -643,14 +1008,18 @@ class SyncManager:
             logger.error(f"Error en sync manual de par: {e}")
         finally:
             with self._lock:
-                self._active_syncs.discard(lock_id)
+                self._active_syncs = self._active_syncs - {lock_id}
 
     def _sync_single_pair(self, account, pair) -> Tuple[bool, str, int]:
         """Lógica central para sincronizar un par (SyncPair)"""
         logger.info(f"Sincronizando par: {pair.local_path} -> {pair.remote_path}")
 
-        # Buffer heurístico para renombres
-        recent_events = []
+        # Índice heurístico para renombres: (carpeta, extensión, acción) -> eventos
+        # en orden de llegada, para emparejar Deleted/Uploading en O(1)
+        recent_events: Dict[Tuple[str, str, str], deque] = defaultdict(deque)
+        events_seen = 0
+        # Algún bisync de este par fue cancelado por stop()
+        was_cancelled = False
 
         # Determinar estado
         pair_status = SyncStatus.SYNCING
@@ -659,7 +1028,7 @@ class SyncManager:
 
         remote_path = f"{account.remote_name}:{pair.remote_path}"
         local_path = pair.local_path
-        local_path_resolved = str(Path(local_path).resolve())
+        local_path_resolved = self._resolve_local(local_path)
         
         # --- PROCESAR RENOMBRES SERVER-SIDE ANTES DEL BISYNC ---
         # Esto evita duplicación de archivos al renombrar localmente
@@ -674,64 +1043,87 @@ class SyncManager:
             if handler and isinstance(handler, ChangeHandler):
                 handler.set_sync_in_progress(True)
 
+        pair_name = Path(local_path).name
+
         def run_bisync(resync_mode):
-            nonlocal recent_events
+            nonlocal recent_events, events_seen, was_cancelled
             inner_success = True
             inner_message = "Sincronización completada"
             file_operations_count = 0
 
             # No enviar sync_start como actividad de archivo
-            logger.debug(f"Iniciando sincronización para {account.name} - {Path(local_path).name}")
+            logger.debug(f"Iniciando sincronización para {account.name} - {pair_name}")
 
             # --- PRE-LIMPIEZA PROACTIVA ---
             # Si hay un lock file huérfano de una sesión anterior fallida, rclone fallará inmediatamente.
             # Intentamos detectarlo antes de empezar.
             try:
-                bisync_cache = Path.home() / ".cache" / "rclone" / "bisync"
-                if bisync_cache.exists():
+                now = time.time_ns()  # Reloj de pared: se compara con mtimes de archivos
+                dir_mtime = _BISYNC_CACHE.stat().st_mtime_ns
+                cached_mtime, next_expiry = self._lck_scan_cache
+                
+                # Reescanear solo si cambió el directorio o si algún lock ya visto
+                # ha cumplido la edad de zombie desde el último escaneo
+                if dir_mtime != cached_mtime or now >= next_expiry:
+                    next_expiry = float("inf")
                     # Buscamos archivos .lck que parezcan de este par
                     # Rclone nombra: path1..path2.lck donde pathX tiene / y : reemplazados
                     # Hacemos una búsqueda laxa para limpiar basura obvia
-                    for f in bisync_cache.glob("*.lck"):
-                        # Si el archivo tiene más de 5 minutos, asumimos que es zombie (rclone bisync no suele tardar tanto en lock sin actividad)
-                        try:
-                            mtime = f.stat().st_mtime
-                            if time.time() - mtime > 300: # 5 minutos
-                                logger.warning(f"Limpiando lock file antiguo/zombie: {f.name}")
-                                f.unlink()
-                        except: pass
-            except: pass
+                    with os.scandir(_BISYNC_CACHE) as entries:
+                        for entry in entries:
+                            if not entry.name.endswith(".lck"):
+                                continue
+                            # Si el archivo tiene más de 5 minutos, asumimos que es zombie (rclone bisync no suele tardar tanto en lock sin actividad)
+                            try:
+                                mtime = entry.stat(follow_symlinks=False).st_mtime_ns
+                                if now - mtime > _LOCK_MAX_AGE_NS:
+                                    logger.warning(f"Limpiando lock file antiguo/zombie: {entry.name}")
+                                    os.unlink(entry.path)
+                                else:
+                                    next_expiry = min(next_expiry, mtime + _LOCK_MAX_AGE_NS)
+                            except OSError:
+                                pass  # Ya eliminado por rclone u otro proceso
+                    
+                    # Los borrados modifican el directorio: guardar su mtime final
+                    self._lck_scan_cache = (_BISYNC_CACHE.stat().st_mtime_ns, next_expiry)
+            except OSError:
+                pass  # Sin caché de bisync todavía: no hay locks que limpiar
 
-            logger.info(f"Lanzando bisync (resync={resync_mode}) para {account.name} - {Path(local_path).name}")
+            logger.info(f"Lanzando bisync (resync={resync_mode}) para {account.name} - {pair_name}")
 
             for line in self.rclone.bisync_stream(local_path, remote_path, resync=resync_mode):
                 line = line.strip()
                 if not line: continue
                 
-                line_lower = line.lower()
+                # Cancelado por stop(): no es un fallo de rclone
+                if line.startswith(STREAM_CANCELLED):
+                    was_cancelled = True
+                    inner_success = False
+                    inner_message = "Sincronización cancelada"
+                    break
                 
                 # Señal de reintento desde rclone_wrapper (lock limpiado)
                 if "RETRY_NEEDED" in line:
                     logger.info("Lock file limpiado, se reintentará automáticamente")
                     continue
                 
-                if any(x in line_lower for x in ["error", "fatal", "failed", "critical"]):
+                if _ERROR_RE.search(line):
                     # Ignorar avisos que no son errores fatales de ejecución
-                    if "ignoring" in line_lower:
+                    if _IGNORED_ERROR_RE.search(line):
                         continue
 
                     # No tratar como error fatal si es terminación normal por señal (SIGTERM = 143, SIGINT = 130)
-                    if "código 143" in line or "código 130" in line or "signal" in line_lower or "terminated" in line_lower:
+                    if _SIGNAL_EXIT_RE.search(line):
                         logger.info(f"rclone terminado por señal del sistema: {line}")
                         continue
                     
                     # Ignorar error de "cannot remove lockfile" - es benigno (ya lo eliminamos nosotros)
-                    if "cannot remove lockfile" in line_lower or "no such file or directory" in line_lower:
+                    if _BENIGN_LOCK_RE.search(line):
                         logger.debug(f"Ignorando error benigno de lock file: {line}")
                         continue
 
                     # No enviar errores de lock file al panel de actividad (se manejan internamente con reintentos)
-                    is_lock_error = "lock file found" in line_lower or "prior lock" in line_lower
+                    is_lock_error = _LOCK_ERROR_RE.search(line) is not None
 
                     # Todos estos errores se manejan internamente con lógica de reintentos, no enviar al panel de actividad
                     if is_lock_error:
@@ -744,98 +1136,99 @@ class SyncManager:
 
                     # No enviar errores internos de rclone al panel de actividad (se manejan con reintentos)
                 elif "INFO" in line:
-                    # Descartar líneas de resumen estadístico para no ensuciar la actividad
-                    if "changes:" in line_lower or "delta" in line_lower or "synchronizing" in line_lower:
+                    # Una sola decisión por línea: acción sobre archivo y no resumen estadístico
+                    is_file_action = _FILE_ACTION_RE.search(line) is not None and not _STATS_RE.search(line)
+                    if not is_file_action:
                         continue
 
-                    if any(x in line_lower for x in ["copied", "updated", "deleted", "moved", "skipped", "removed"]):
+                    match = _INFO_LINE_RE.search(line)
+                    if match:
                         try:
-                            content = line.split("INFO")[-1].strip()
-                            if content.startswith(":"): content = content[1:].strip()
-                            
-                            parts = [p.strip() for p in content.split(":")]
-                            file_path = None
-                            action = "uploading"
-
-                            # Formato 1: "PathX: ruta/al/archivo: Acción" (3 o más partes)
-                            if len(parts) >= 3 and ("Path1" in parts[0] or "Path2" in parts[0]):
-                                file_path = parts[1]
-                                action_text = parts[2].lower()
-                                if "Path2" in parts[0] or "download" in action_text:
-                                    action = "downloading"
-                            
-                            # Formato 2: "ruta/al/archivo: Acción" (2 partes, común en borrados o resync)
-                            elif len(parts) >= 2:
-                                # Asegurarse de que parts[0] no sea un nivel de log o PathX
-                                if not any(x in parts[0] for x in ["Path1", "Path2", "INFO", "NOTICE"]):
-                                    file_path = parts[0]
-                                    action_text = parts[1].lower()
-                                    if "download" in action_text: action = "downloading"
+                            side = match.group("side") or ""
+                            file_path = match.group("path").strip()
+                            action_text = match.group("action").lower()
+
+                            # Formato 1: "PathX: ruta/al/archivo: Acción"
+                            # Formato 2: "ruta/al/archivo: Acción" (común en borrados o resync);
+                            # ahí la ruta no debe ser un nivel de log o PathX
+                            if not side and any(x in file_path for x in ("Path1", "Path2", "INFO", "NOTICE")):
+                                file_path = None
+
+                            if "Path2" in side or "download" in action_text:
+                                action = "downloading"
+                            else:
+                                action = "uploading"
                             
                             if file_path:
-                                # Limpiar el nombre del archivo
-                                file_name = file_path.split("/")[-1]
+                                # Separar carpeta y nombre una sola vez (sin construir Path por línea)
+                                parent, _, file_name = file_path.rpartition("/")
                                 
                                 # Refinar acción por palabras clave en toda la línea
-                                if any(x in line_lower for x in ["deleted", "removing", "removed", "unlink"]):
+                                if _DELETE_WORD_RE.search(line):
                                     action = "deleted"
-                                elif any(x in line_lower for x in ["moved", "renamed", "renaming"]):
+                                elif _MOVE_WORD_RE.search(line):
                                     action = "moved"
                                 
                                 # Validar que no estemos capturando una palabra clave de rclone como archivo
-                                if file_name.lower() not in ["deleted", "copied", "updated", "moved", "skipped", "changes", "renamed"]:
+                                if file_name.lower() not in _ACTION_WORDS:
                                     # Heurística de Renombres: Buffer temporal
                                     # Si vemos Deleted A y Uploading B (misma ext, misma carpeta) -> MOVED
                                     
                                     # Guardamos evento actual
-                                    current_event = {
-                                        "name": file_name,
-                                        "path": file_path,
-                                        "action": action,
-                                        "time": time.time(),
-                                        "ext": Path(file_path).suffix,
-                                        "parent": str(Path(file_path).parent)
-                                    }
+                                    current_event = _FileEvent(
+                                        file_name,
+                                        file_path,
+                                        action,
+                                        time.monotonic(),
+                                        os.path.splitext(file_name)[1],
+                                        parent or "."
+                                    )
                                     
-                                    # Buscar coincidencia en eventos recientes (últimos 3 segs)
-                                    matched_rename = False
-                                    for prev in recent_events[:]:
-                                        # Limpiar eventos viejos (> 5s)
-                                        if current_event["time"] - prev["time"] > 5:
-                                            recent_events.remove(prev)
-                                            continue
-                                            
-                                        # Lógica de emparejamiento:
-                                        # 1. Uno Deleted y otro Uploading
-                                        # 2. Misma extensión (ej .zip)
-                                        # 3. Misma carpeta padre
-                                        if (prev["action"] == "deleted" and action == "uploading") or \
-                                           (prev["action"] == "uploading" and action == "deleted"):
-                                            
-                                            if prev["ext"] == current_event["ext"] and \
-                                               prev["parent"] == current_event["parent"]:
-                                                
-                                                # ¡Es un renombre! Emitimos MOVED con el nombre nuevo
-                                                final_name = file_name if action == "uploading" else prev["name"]
-                                                final_path = file_path if action == "uploading" else prev["path"]
-                                                
-                                                if self._on_file_activity:
-                                                    # Avisar que fue renombrado (sobrescribimos la acción anterior visualmente si se pudo, 
-                                                    # pero como es asíncrono, mejor emitimos el evento limpio)
-                                                    self._on_file_activity(account.id, final_name, "moved", final_path)
-                                                
-                                                matched_rename = True
-                                                recent_events.remove(prev) # Consumir evento
-                                                break
+                                    # Lógica de emparejamiento:
+                                    # 1. Uno Deleted y otro Uploading
+                                    # 2. Misma extensión (ej .zip)
+                                    # 3. Misma carpeta padre
+                                    # 4. Con menos de 5s de diferencia
+                                    matched_prev = None
+                                    if action in ("deleted", "uploading"):
+                                        opposite = "uploading" if action == "deleted" else "deleted"
+                                        candidates = recent_events.get(
+                                            (current_event.parent, current_event.ext, opposite)
+                                        )
+                                        # Descartar eventos viejos (> 5s), siempre al principio
+                                        while candidates and current_event.time - candidates[0].time > 5:
+                                            candidates.popleft()
+                                        if candidates:
+                                            matched_prev = candidates.popleft() # Consumir evento
                                     
-                                    if not matched_rename:
-                                        recent_events.append(current_event)
+                                    if matched_prev is not None:
+                                        # ¡Es un renombre! Emitimos MOVED con el nombre nuevo
+                                        final_name = file_name if action == "uploading" else matched_prev.name
+                                        final_path = file_path if action == "uploading" else matched_prev.path
+                                        
+                                        # Avisar que fue renombrado (sobrescribimos la acción anterior visualmente si se pudo, 
+                                        # pero como es asíncrono, mejor emitimos el evento limpio)
+                                        self._emit_activity(account.id, final_name, "moved", final_path)
+                                    else:
+                                        if action in ("deleted", "uploading"):
+                                            recent_events[
+                                                (current_event.parent, current_event.ext, action)
+                                            ].append(current_event)
                                         # Emitir evento normal si no se emparejó (aún)
                                         # Nota: Esto puede mostrar "Deleted" brevemente antes del "Moved",
                                         # pero es mejor que perder el evento si no se empareja.
-                                        if self._on_file_activity:
-                                            self._on_file_activity(account.id, file_name, action, file_path)
+                                        if self._emit_activity(account.id, file_name, action, file_path):
                                             file_operations_count += 1
+                                    
+                                    # Barrido periódico de grupos caducados
+                                    events_seen += 1
+                                    if events_seen % 50 == 0:
+                                        expired = [
+                                            key for key, events in recent_events.items()
+                                            if not events or current_event.time - events[-1].time > 5
+                                        ]
+                                        for key in expired:
+                                            del recent_events[key]
                                         
                         except Exception as e:
                             logger.debug(f"Error parseando línea INFO: {e}")
@@ -853,8 +1246,12 @@ class SyncManager:
             # 1. Intentar Sincronización Normal (Primero confiamos en rclone)
             success, message, file_count = run_bisync(not pair.last_sync)
 
+            def cancelled() -> bool:
+                """No seguir reparando si se canceló el bisync o se está deteniendo el servicio"""
+                return was_cancelled or self._stop_requested.is_set()
+
             # Reintento si falla (Protocolo de REPARACIÓN GRADUAL)
-            if not success:
+            if not success and not cancelled():
                 # Solo si el error es de LOCK FILE prior, intervenimos
                 if "lock file found" in message or "prior lock" in message:
                     logger.warning(f"Bloqueo detectado para {account.name}. Intentando desbloqueo...")
@@ -870,40 +1267,45 @@ class SyncManager:
                              Path(lock_path_extracted).unlink()
                         else:
                             # Estrategia 2: Búsqueda heurística (Fallback)
-                            cache_path = Path.home() / ".cache" / "rclone" / "bisync"
-                            if cache_path.exists():
-                                safe_local = "".join(c if c.isalnum() else "_" for c in local_path)
-                                for f in cache_path.glob("*.lck"):
-                                    if safe_local in f.name or "lxdrive" in f.name:
-                                        logger.info(f"Desbloqueando sesión (heurística): {f.name}")
-                                        f.unlink()
+                            safe_local = self._safe_local_name(local_path)
+                            with os.scandir(_BISYNC_CACHE) as entries:
+                                for entry in entries:
+                                    name = entry.name
+                                    if name.endswith(".lck") and (safe_local in name or "lxdrive" in name):
+                                        logger.info(f"Desbloqueando sesión (heurística): {name}")
+                                        os.unlink(entry.path)
                     except FileNotFoundError:
                         pass # Ya se borró, mejor
                     except Exception as e:
                         logger.warning(f"No se pudo limpiar lock: {e}")
 
                 # Intento 2: Reintentar NORMAL tras desbloqueo
-                logger.info("Reintentando sincronización tras desbloqueo...")
                 time.sleep(1) # Dar un respiro al filesystem
-                success, message, retry_count = run_bisync(False)
-                file_count += retry_count
+                if not cancelled():
+                    logger.info("Reintentando sincronización tras desbloqueo...")
+                    success, message, retry_count = run_bisync(False)
+                    file_count += retry_count
 
             # Si sigue fallando (o no era lock), vamos a resync
-            if not success:
+            if not success and not cancelled():
                 logger.warning("Iniciando LIMPIEZA PROFUNDA (Resync)...")
                 try:
                     # Limpiar todo lo relacionado para forzar resync
-                    cache_path = Path.home() / ".cache" / "rclone" / "bisync"
-                    if cache_path.exists():
-                        safe_local = "".join(c if c.isalnum() else "_" for c in local_path)
-                        for f in cache_path.glob("*"):
-                            if safe_local in f.name:
-                                f.unlink()
-                except: pass
+                    safe_local = self._safe_local_name(local_path)
+                    with os.scandir(_BISYNC_CACHE) as entries:
+                        for entry in entries:
+                            if safe_local in entry.name and entry.is_file(follow_symlinks=False):
+                                os.unlink(entry.path)
+                except OSError as e:
+                    logger.debug(f"Limpieza profunda incompleta: {e}")
 
                 # Intento 3 con resync forzado
-                success, message, resync_count = run_bisync(True)
-                file_count += resync_count
+                if not cancelled():
+                    success, message, resync_count = run_bisync(True)
+                    file_count += resync_count
+
+            if cancelled() and not success:
+                logger.info(f"Sincronización de {pair_name} cancelada")
 
             if success:
                 pair.last_sync = datetime.now().isoformat()
@@ -924,6 +1326,7 @@ class SyncManager:
     def resume_account(self, account_id: str):
         """Reanuda la sincronización de una cuenta"""
         self.account_manager.set_status(account_id, SyncStatus.IDLE)
+        self._wakeup.set()
         logger.info(f"Cuenta reanudada: {account_id}")
     
     def pause_all(self):
@@ -15,10 +15,11 @@ from PyQt6.QtWidgets import (
     QDialog, QFormLayout, QDialogButtonBox,
     QAbstractItemView, QScrollArea, QSystemTrayIcon # Added QSystemTrayIcon
 )
-from PyQt6.QtCore import Qt, QSize, QTimer, pyqtSignal, QThread, QObject
+from PyQt6.QtCore import Qt, QSize, QTimer, pyqtSignal, QThread, QObject, QMetaObject
 from PyQt6.QtGui import QIcon, QFont, QAction, QColor, QPalette, QPixmap
+import threading
 from pathlib import Path
-from typing import Optional, cast
+from typing import Optional, List, Tuple, cast
 from datetime import datetime
 from loguru import logger
 
@@ -1157,6 +1158,39 @@ class SyncBridge(QObject):
     complete_signal = pyqtSignal(object)
     error_signal = pyqtSignal(str, str)
     activity_signal = pyqtSignal(str, str, str, str)
+    activity_batch_signal = pyqtSignal(list)
+
+    # Ventana de agrupación de eventos de actividad (ms)
+    ACTIVITY_FLUSH_MS = 50
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Eventos de actividad pendientes, se entregan a la UI en lotes
+        self._activity_buf: List[Tuple[str, str, str, str]] = []
+        self._activity_lock = threading.Lock()
+        self._activity_timer = QTimer(self)
+        self._activity_timer.setSingleShot(True)
+        self._activity_timer.setInterval(self.ACTIVITY_FLUSH_MS)
+        self._activity_timer.timeout.connect(self._flush_activity)
+
+    def queue_activity(self, account_id: str, name: str, action: str, path: str):
+        """Encola un evento de actividad (seguro desde cualquier hilo)"""
+        with self._activity_lock:
+            self._activity_buf.append((account_id, name, action, path))
+            first = len(self._activity_buf) == 1
+        
+        # Solo el primer evento de la ventana arranca el temporizador
+        if first:
+            QMetaObject.invokeMethod(
+                self._activity_timer, "start", Qt.ConnectionType.QueuedConnection
+            )
+
+    def _flush_activity(self):
+        """Emite los eventos acumulados como un único lote"""
+        with self._activity_lock:
+            batch, self._activity_buf = self._activity_buf, []
+        if batch:
+            self.activity_batch_signal.emit(batch)
 
 class MainWindow(QMainWindow):
     """Ventana principal de lX Drive"""
@@ -1185,6 +1219,7 @@ class MainWindow(QMainWindow):
         self.bridge.complete_signal.connect(self._on_sync_complete_ui)
         self.bridge.error_signal.connect(self._on_sync_error_ui)
         self.bridge.activity_signal.connect(self._on_file_activity_ui)
+        self.bridge.activity_batch_signal.connect(self._on_file_activity_batch_ui)
 
         self._account_widgets: dict[str, AccountWidget] = {}  # account_id -> AccountWidget
         self.selected_account: Optional[Account] = None
@@ -1625,8 +1660,8 @@ class MainWindow(QMainWindow):
         self.bridge.error_signal.emit(account_id, message)
 
     def _handle_file_activity(self, account_id: str, name: str, action_str: str, path: str):
-        """Callback para actividad de archivos - emite señal al bridge"""
-        self.bridge.activity_signal.emit(account_id, name, action_str, path)
+        """Callback para actividad de archivos - encola en el bridge"""
+        self.bridge.queue_activity(account_id, name, action_str, path)
 
         # Conectar señales del panel de actividad
         if self.activity_panel is not None:
@@ -2078,6 +2113,11 @@ class MainWindow(QMainWindow):
         # AQUÍ ESTABA EL ERROR: Llamar al proceso visual, NO volver a emitir la señal
         self._on_file_activity(account_id, name, action_str, path)
 
+    def _on_file_activity_batch_ui(self, batch: list):
+        """Manejador de señal para un lote de eventos de actividad"""
+        for account_id, name, action_str, path in batch:
+            self._on_file_activity(account_id, name, action_str, path)
+
     def _show_mount_details(self):
         """Muestra detalles del montaje en un modal"""
         from PyQt6.QtWidgets import QMessageBox
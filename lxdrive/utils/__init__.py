@@ -2,7 +2,7 @@
 Utilities for lX Drive
 """
 
-from .config import Config
+from .config import Config, get_config
 from .logger import setup_logger
 
-__all__ = ["Config", "setup_logger"]
+__all__ = ["Config", "get_config", "setup_logger"]
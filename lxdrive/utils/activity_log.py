@@ -40,7 +40,7 @@ class ActivityAction(Enum):
     STOPPED = "stopped"
 
 
-@dataclass
+@dataclass(slots=True)
 class ActivityEntry:
     """Representa una entrada de actividad"""
     timestamp: str
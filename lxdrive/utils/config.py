@@ -3,13 +3,23 @@
 Config - Gestión de configuración de la aplicación
 """
 
+import hashlib
 import json
+import threading
 import yaml
 from pathlib import Path
 from typing import Any, Optional, Dict
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field, fields, asdict
 from loguru import logger
 
+from .fileio import atomic_write
+
+# Usar los bindings en C de libyaml si PyYAML se compiló con ellos
+try:
+    from yaml import CSafeLoader as _YamlLoader, CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader, SafeDumper as _YamlDumper
+
 
 @dataclass
 class AppConfig:
@@ -53,6 +63,10 @@ class AppConfig:
             self.mount_base_dir = str(Path.home() / "CloudDrives")
 
 
+# Claves válidas de configuración (evita hasattr() por cada clave)
+_CONFIG_FIELDS = frozenset(f.name for f in fields(AppConfig))
+
+
 class Config:
     """
     Gestor de configuración de lX Drive.
@@ -60,28 +74,28 @@ class Config:
     Maneja la persistencia de configuración en archivos YAML.
     """
     
-    _instance: Optional["Config"] = None
-    
-    def __new__(cls, *args, **kwargs):
-        """Singleton pattern"""
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._initialized = False
-        return cls._instance
+    # Segundos de espera para agrupar varios set() en una sola escritura
+    SAVE_DELAY = 0.25
     
     def __init__(self, config_dir: Optional[Path] = None):
-        if self._initialized:
-            return
-        
         self.config_dir = config_dir or Path.home() / ".config" / "lxdrive"
         self.config_file = self.config_dir / "config.yaml"
+        # Copia ya parseada del YAML, válida mientras no cambie su mtime
+        self.cache_file = self.config_dir / "config.yaml.cache.json"
         
         self._config = AppConfig()
+        # asdict() del config, válido hasta la siguiente modificación
+        self._asdict_cache: Optional[Dict[str, Any]] = None
+        
+        # Escritura diferida: set() marca cambios y un temporizador los guarda juntos
+        self._dirty = False
+        self._save_timer: Optional[threading.Timer] = None
+        self._save_lock = threading.Lock()
+        # Hash del último YAML escrito: no reescribir si el contenido no cambia
+        self._last_saved_hash: Optional[bytes] = None
         
         self._ensure_config_dir()
         self._load()
-        
-        self._initialized = True
     
     def _ensure_config_dir(self):
         """Crea el directorio de configuración si no existe"""
@@ -89,34 +103,69 @@ class Config:
     
     def _load(self):
         """Carga la configuración desde el archivo"""
-        if not self.config_file.exists():
+        try:
+            yaml_mtime = self.config_file.stat().st_mtime_ns
+        except FileNotFoundError:
             self._save()  # Crear archivo con valores por defecto
             return
         
         try:
-            with open(self.config_file, "r", encoding="utf-8") as f:
-                data = yaml.safe_load(f) or {}
+            data = self._load_cache(yaml_mtime)
+            if data is None:
+                with open(self.config_file, "r", encoding="utf-8") as f:
+                    data = yaml.load(f, Loader=_YamlLoader) or {}
+                self._write_cache(yaml_mtime, data)
             
             # Actualizar config con valores cargados
             for key, value in data.items():
-                if hasattr(self._config, key):
+                if key in _CONFIG_FIELDS:
                     setattr(self._config, key, value)
+            self._asdict_cache = None
             
             logger.debug("Configuración cargada")
             
         except Exception as e:
             logger.error(f"Error cargando configuración: {e}")
     
+    def _load_cache(self, yaml_mtime: int) -> Optional[Dict[str, Any]]:
+        """Devuelve la config cacheada si corresponde al mtime actual del YAML"""
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if not isinstance(cached, dict) or cached.get("mtime_ns") != yaml_mtime:
+            return None
+        data = cached.get("config")
+        return data if isinstance(data, dict) else None
+    
+    def _write_cache(self, yaml_mtime: int, data: Dict[str, Any]):
+        """Guarda la config parseada junto al mtime del YAML del que procede"""
+        try:
+            with open(self.cache_file, "w", encoding="utf-8") as f:
+                json.dump({"mtime_ns": yaml_mtime, "config": data}, f, ensure_ascii=False)
+        except (OSError, TypeError, ValueError) as e:
+            logger.debug(f"No se pudo guardar la caché de configuración: {e}")
+    
     def _save(self):
         """Guarda la configuración al archivo"""
         try:
-            with open(self.config_file, "w", encoding="utf-8") as f:
-                yaml.dump(
-                    asdict(self._config), 
-                    f, 
-                    default_flow_style=False,
-                    allow_unicode=True
-                )
+            data = self._as_dict()
+            content = yaml.dump(
+                data, 
+                Dumper=_YamlDumper,
+                default_flow_style=False,
+                allow_unicode=True
+            ).encode("utf-8")
+            
+            content_hash = hashlib.blake2b(content, digest_size=16).digest()
+            if content_hash == self._last_saved_hash:
+                return
+            
+            atomic_write(self.config_file, content)
+            self._last_saved_hash = content_hash
+            self._write_cache(self.config_file.stat().st_mtime_ns, data)
             logger.debug("Configuración guardada")
         except Exception as e:
             logger.error(f"Error guardando configuración: {e}")
@@ -142,22 +191,79 @@ class Config:
             key: Nombre de la configuración
             value: Nuevo valor
         """
-        if hasattr(self._config, key):
+        if key in _CONFIG_FIELDS:
+            if getattr(self._config, key) == value:
+                return  # Sin cambio efectivo: nada que guardar
             setattr(self._config, key, value)
-            self._save()
+            self._asdict_cache = None
+            self._schedule_save()
         else:
             logger.warning(f"Configuración desconocida: {key}")
     
+    def _schedule_save(self):
+        """Programa el guardado, reiniciando la espera si ya había uno pendiente"""
+        with self._save_lock:
+            self._dirty = True
+            if self._save_timer:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(self.SAVE_DELAY, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+    
+    def flush(self):
+        """Escribe inmediatamente los cambios pendientes (llamar al cerrar la app)"""
+        with self._save_lock:
+            if self._save_timer:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if not self._dirty:
+                return
+            self._dirty = False
+            self._save()
+    
+    def _as_dict(self) -> Dict[str, Any]:
+        """asdict() cacheado del config (no modificar el resultado)"""
+        if self._asdict_cache is None:
+            self._asdict_cache = asdict(self._config)
+        return self._asdict_cache
+    
     def get_all(self) -> Dict[str, Any]:
         """Obtiene toda la configuración como diccionario"""
-        return asdict(self._config)
+        return self._as_dict().copy()
     
     def reset(self):
         """Restablece la configuración a valores por defecto"""
         self._config = AppConfig()
-        self._save()
+        self._asdict_cache = None
+        self._dirty = True
+        self.flush()
     
     @property
     def app(self) -> AppConfig:
         """Acceso directo al objeto de configuración"""
+        # Quien lo recibe puede modificarlo: invalidar la copia cacheada
+        self._asdict_cache = None
         return self._config
+
+
+# Instancia compartida, creada la primera vez que se pide
+_config_singleton: Optional[Config] = None
+_config_singleton_lock = threading.Lock()
+
+
+def get_config(config_dir: Optional[Path] = None) -> Config:
+    """
+    Obtiene la configuración compartida de la aplicación.
+    
+    Args:
+        config_dir: Directorio de configuración (solo se usa en la primera llamada)
+        
+    Returns:
+        La instancia única de Config
+    """
+    global _config_singleton
+    if _config_singleton is None:
+        with _config_singleton_lock:
+            if _config_singleton is None:
+                _config_singleton = Config(config_dir)
+    return _config_singleton
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Utilidades de escritura de archivos
+"""
+
+import os
+from pathlib import Path
+
+
+def atomic_write(path: Path, data: bytes):
+    """
+    Escribe un archivo de forma atómica.
+
+    El contenido se escribe en un temporal junto al destino y se renombra
+    encima con os.replace, así un cierre inesperado nunca deja el archivo
+    truncado o a medio escribir.
+
+    Args:
+        path: Archivo destino
+        data: Contenido completo del archivo
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
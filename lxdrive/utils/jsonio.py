@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Utilidades de (de)serialización JSON, con orjson si está disponible
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """
+    Parsea JSON, con orjson si está disponible.
+
+    orjson.JSONDecodeError hereda de json.JSONDecodeError, así que los
+    llamadores capturan la misma excepción en ambos casos.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serializa a JSON (bytes UTF-8) con orjson si está disponible"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")
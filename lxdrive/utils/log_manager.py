@@ -14,7 +14,7 @@ from typing import List, Optional, Callable
 from collections import deque
 
 
-@dataclass
+@dataclass(slots=True)
 class LogEntry:
     """Representa una entrada de log"""
     timestamp: datetime